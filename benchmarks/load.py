@@ -0,0 +1,178 @@
+"""
+Throughput scaling benchmark for identicon generation.
+
+Drives Generator.generate() using 1 to N workers, both in thread mode (showing
+the effects of GIL contention, for example within Pillow encoders) and in
+process mode, across requested output formats. For every run, throughput,
+median (p50) and p99 latency, and scaling efficiency (throughput relative to
+a single worker, divided by number of workers) are reported::
+
+  python -m benchmarks.load --workers 8 --format png --format jpeg
+"""
+
+# Standard library imports.
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Library imports.
+from pydenticon import get_generator
+
+
+# Generator configuration used by the benchmark.
+GENERATOR_CONFIGURATION = {"rows": 5, "columns": 5, "foreground": ["#000000", "#ff0000", "#00ff00", "#0000ff"]}
+
+# Supported worker modes.
+MODES = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+def _run_chunk(inputs, width, height, padding, output_format):
+    """
+    Generates identicons for a chunk of inputs.
+
+    Returns:
+
+      List of latencies (in seconds) for every generated identicon.
+    """
+
+    generator = get_generator(**GENERATOR_CONFIGURATION)
+    latencies = []
+
+    for data in inputs:
+        start = time.perf_counter()
+        generator.generate(data, width, height, padding=padding, output_format=output_format)
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def percentile(values, percent):
+    """
+    Calculates percentile of passed values using nearest-rank method.
+
+    Arguments:
+
+      values - Sorted list of values.
+
+      percent - Percentile to calculate, between 0 and 100.
+
+    Returns:
+
+      Percentile value, or None if no values were passed.
+    """
+
+    if not values:
+        return None
+
+    rank = max(int(-(-percent * len(values) // 100)), 1)
+
+    return values[rank - 1]
+
+
+def run(mode, workers, count, width, height, padding=(0, 0, 0, 0), output_format="png", chunk_size=50):
+    """
+    Runs a single benchmark.
+
+    Arguments:
+
+      mode - Worker mode, either "thread" or "process".
+
+      workers - Number of workers.
+
+      count - Number of identicons to generate.
+
+      width, height, padding, output_format - Render parameters, identical to
+      ones accepted by Generator.generate() method.
+
+      chunk_size - Number of identicons submitted to a worker at once.
+
+    Returns:
+
+      Dictionary with the following keys:
+
+        throughput - Generated identicons per second.
+
+        p50 - Median latency of generating a single identicon, in seconds.
+
+        p99 - 99th percentile latency of generating a single identicon, in
+        seconds.
+    """
+
+    inputs = ["user%d@example.com" % i for i in range(count)]
+    chunks = [inputs[i:i + chunk_size] for i in range(0, count, chunk_size)]
+
+    with MODES[mode](max_workers=workers) as executor:
+        # Make sure all the workers are up and running before starting the
+        # clock.
+        list(executor.map(_run_chunk, [inputs[:1]] * workers, [width] * workers, [height] * workers,
+                          [padding] * workers, [output_format] * workers))
+
+        start = time.perf_counter()
+        futures = [executor.submit(_run_chunk, chunk, width, height, padding, output_format) for chunk in chunks]
+        latencies = sorted(latency for future in futures for latency in future.result())
+        elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": count / elapsed if elapsed else None,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        }
+
+
+def scaling(mode, max_workers, count, width, height, padding=(0, 0, 0, 0), output_format="png"):
+    """
+    Runs the benchmark with 1 to max_workers workers.
+
+    Returns:
+
+      List of benchmark results (as returned by run() function), one per
+      number of workers, extended with "workers" and "efficiency" keys.
+    """
+
+    results = []
+
+    for workers in range(1, max_workers + 1):
+        result = run(mode, workers, count, width, height, padding, output_format)
+        result["workers"] = workers
+
+        baseline = results[0]["throughput"] if results else result["throughput"]
+        result["efficiency"] = result["throughput"] / (baseline * workers) if baseline and result["throughput"] else None
+
+        results.append(result)
+
+    return results
+
+
+def main(arguments=None):
+    """
+    Entry point for running the benchmark as a script.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark throughput scaling of identicon generation.")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Maximum number of workers. Default is 4.")
+    parser.add_argument("-m", "--mode", action="append", choices=sorted(MODES), help="Worker mode. Can be specified "
+                        "multiple times. Default is both thread and process.")
+    parser.add_argument("-F", "--format", action="append", help="Output format. Can be specified multiple times. "
+                        "Default is png.")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="Number of identicons per run. Default is 1000.")
+    parser.add_argument("-s", "--size", type=int, default=200, help="Width and height of identicons. Default is 200.")
+    parser.add_argument("-p", "--padding", type=int, default=20, help="Padding around identicons. Default is 20.")
+    args = parser.parse_args(arguments)
+
+    report = {}
+
+    for mode in args.mode or ["thread", "process"]:
+        for output_format in args.format or ["png"]:
+            report["%s/%s" % (mode, output_format)] = scaling(mode, args.workers, args.count, args.size, args.size,
+                                                              (args.padding,) * 4, output_format)
+
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Allocation and peak memory profiling for identicon generation.
+
+The generate() pipeline is split into stages, and every stage is run under
+tracemalloc in order to measure memory blocks and bytes it retains, as well as
+its peak memory usage. Stages call the same Generator methods as generate()
+does - "render" covers the whole Generator._generate_image() call, while
+"canvas" and "encode" break it down into drawing and encoding. Results are
+averaged per identicon. Pillow allocates image buffers outside of the Python
+memory allocator, which means tracemalloc cannot see them - buffer sizes of
+the canvas and converted image are therefore reported separately, based on
+image dimensions (for information only).
+
+Peak RSS of the process is reported for a batch run of generate().
+
+Results can be checked against budgets stored in memory_budgets.json, in which
+case the profiler fails if any of the measurements exceeds its budget::
+
+  python -m benchmarks.memory --format png --format jpeg --check
+"""
+
+# Standard library imports.
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+# Library imports.
+from pydenticon import Generator
+
+# Resource module is not available on all platforms.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Stages of the generate() pipeline. Stages "canvas" and "encode" are parts of
+# the "render" stage.
+STAGES = ["digest", "matrix", "render", "canvas", "encode"]
+
+# Default location of the budgets file.
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory_budgets.json")
+
+# Pillow stores pixels of both RGB and RGBA images using four bytes.
+PILLOW_PIXEL_SIZE = 4
+
+
+def _snapshot():
+    """
+    Takes a tracemalloc snapshot, excluding allocations made by tracemalloc
+    itself.
+    """
+
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _measure(totals, stage, function, *args):
+    """
+    Runs a single stage, adding its memory usage to totals.
+
+    Arguments:
+
+      totals - Dictionary with totals for every stage.
+
+      stage - Name of the stage.
+
+      function - Function implementing the stage.
+
+      args - Arguments for the function.
+
+    Returns:
+
+      Result of the function.
+    """
+
+    before = _snapshot()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+
+    result = function(*args)
+
+    current, peak = tracemalloc.get_traced_memory()
+    after = _snapshot()
+
+    stage_totals = totals[stage]
+    stage_totals["blocks"] += sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    stage_totals["bytes"] += current - start
+    stage_totals["peak"] = max(stage_totals["peak"], peak - start)
+
+    return result
+
+
+def profile_stages(generator, inputs, width, height, padding=(0, 0, 0, 0), output_format="png"):
+    """
+    Profiles memory usage of every generate() stage.
+
+    Arguments:
+
+      generator - Generator instance used for producing the identicons.
+
+      inputs - List of data for which identicons should be generated.
+
+      width, height, padding, output_format - Render parameters, identical to
+      ones accepted by Generator.generate() method.
+
+    Returns:
+
+      Dictionary mapping stage names to dictionaries with the following keys:
+
+        blocks - Average number of memory blocks retained per identicon.
+
+        bytes - Average number of bytes retained per identicon.
+
+        peak - Maximum peak memory usage (in bytes) during the stage.
+
+        image_bytes - Size of Pillow image buffer allocated in the stage (not
+        visible to tracemalloc).
+    """
+
+    jpeg = output_format.upper() == "JPEG"
+    totals = dict((stage, {"blocks": 0, "bytes": 0, "peak": 0, "image_bytes": 0}) for stage in STAGES)
+
+    size = (width + padding[2] + padding[3], height + padding[0] + padding[1])
+    image_bytes = size[0] * size[1] * PILLOW_PIXEL_SIZE
+
+    totals["canvas"]["image_bytes"] = image_bytes
+    # JPEG images get converted to RGB mode prior to encoding.
+    totals["encode"]["image_bytes"] = image_bytes if jpeg else 0
+    totals["render"]["image_bytes"] = totals["canvas"]["image_bytes"] + totals["encode"]["image_bytes"]
+
+    # Warm-up run, so that one-off allocations (imports of Pillow plugins,
+    # caches) do not end-up being attributed to the first identicon.
+    if inputs:
+        generator.generate(inputs[0], width, height, padding=padding, output_format=output_format)
+
+    tracemalloc.start()
+    try:
+        for data in inputs:
+            digest_byte_list = _measure(totals, "digest", generator._data_to_digest_byte_list, data)
+            matrix = _measure(totals, "matrix", generator._generate_matrix, digest_byte_list)
+            foreground = generator.foreground[digest_byte_list[0] % len(generator.foreground)]
+
+            arguments = (matrix, width, height, padding, foreground, generator.background, output_format)
+
+            raw = _measure(totals, "render", generator._generate_image, *arguments)
+            del raw
+
+            image = _measure(totals, "canvas", generator._draw_image, *arguments)
+            raw = _measure(totals, "encode", generator._encode_image, image, output_format)
+
+            del digest_byte_list, matrix, image, raw
+    finally:
+        tracemalloc.stop()
+
+    count = max(len(inputs), 1)
+    for stage_totals in totals.values():
+        stage_totals["blocks"] = float(stage_totals["blocks"]) / count
+        stage_totals["bytes"] = float(stage_totals["bytes"]) / count
+
+    return totals
+
+
+def peak_rss():
+    """
+    Returns peak resident set size of the current process in bytes, or None
+    if it cannot be determined on current platform.
+    """
+
+    if resource is None:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports the value in kilobytes, while macOS uses bytes.
+    if sys.platform == "darwin":
+        return maxrss
+
+    return maxrss * 1024
+
+
+def profile_batch(generator, inputs, width, height, padding=(0, 0, 0, 0), output_format="png"):
+    """
+    Profiles peak memory usage of a batch run of generate().
+
+    Returns:
+
+      Dictionary with the following keys:
+
+        peak - Peak traced memory (in bytes) during the batch.
+
+        rss_before - Peak RSS of the process (in bytes) before the batch.
+
+        rss_after - Peak RSS of the process (in bytes) after the batch.
+    """
+
+    if inputs:
+        generator.generate(inputs[0], width, height, padding=padding, output_format=output_format)
+
+    rss_before = peak_rss()
+
+    tracemalloc.start()
+    try:
+        for data in inputs:
+            generator.generate(data, width, height, padding=padding, output_format=output_format)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"peak": peak, "rss_before": rss_before, "rss_after": peak_rss()}
+
+
+def load_budgets(path=BUDGETS_PATH):
+    """
+    Loads the budgets from passed path.
+
+    Returns:
+
+      Dictionary mapping output formats to dictionaries that map stage names
+      to budgets for the stage's measurements.
+    """
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_budgets(results, budgets):
+    """
+    Checks the profiling results against budgets.
+
+    Arguments:
+
+      results - Dictionary mapping output formats to results of
+      profile_stages() function.
+
+      budgets - Budgets, as returned by load_budgets() function.
+
+    Returns:
+
+      List of strings describing measurements that exceed their budgets.
+    """
+
+    violations = []
+
+    for output_format, stages in sorted(results.items()):
+        for stage, measurements in sorted(stages.items()):
+            stage_budgets = budgets.get(output_format, {}).get(stage, {})
+
+            for measurement, budget in sorted(stage_budgets.items()):
+                if measurements[measurement] > budget:
+                    violations.append("%s/%s/%s: %s exceeds budget of %s" %
+                                      (output_format, stage, measurement, measurements[measurement], budget))
+
+    return violations
+
+
+def main(arguments=None):
+    """
+    Entry point for running the profiler as a script.
+    """
+
+    parser = argparse.ArgumentParser(description="Profile memory usage of identicon generation.")
+    parser.add_argument("-F", "--format", action="append", help="Output format to profile. Can be specified multiple "
+                        "times. Default is png and jpeg.")
+    parser.add_argument("-n", "--count", type=int, default=100, help="Number of identicons to generate. Default is 100.")
+    parser.add_argument("-s", "--size", type=int, default=200, help="Width and height of identicons. Default is 200.")
+    parser.add_argument("-p", "--padding", type=int, default=20, help="Padding around identicons. Default is 20.")
+    parser.add_argument("-b", "--batch", type=int, default=0, help="Number of identicons to generate in a batch run "
+                        "for measuring peak RSS. Default is 0 (no batch run).")
+    parser.add_argument("-c", "--check", action="store_true", help="Fail if any of the measurements exceeds budget.")
+    parser.add_argument("--budgets", default=BUDGETS_PATH, help="Path to budgets file.")
+    args = parser.parse_args(arguments)
+
+    generator = Generator(5, 5, foreground=["#000000", "#ff0000", "#00ff00", "#0000ff"])
+    inputs = ["user%d@example.com" % i for i in range(args.count)]
+    padding = (args.padding,) * 4
+
+    results = {}
+    for output_format in args.format or ["png", "jpeg"]:
+        results[output_format] = profile_stages(generator, inputs, args.size, args.size, padding, output_format)
+
+    report = {"stages": results}
+
+    if args.batch:
+        batch_inputs = ["batch%d@example.com" % i for i in range(args.batch)]
+        report["batch"] = dict((output_format, profile_batch(generator, batch_inputs, args.size, args.size, padding, output_format))
+                               for output_format in results)
+
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+
+    if args.check:
+        violations = check_budgets(results, load_budgets(args.budgets))
+
+        for violation in violations:
+            sys.stderr.write("%s\n" % violation)
+
+        if violations:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
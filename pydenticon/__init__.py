@@ -4,12 +4,301 @@ import hashlib
 # For saving the images from Pillow.
 from io import BytesIO
 
+# For guarding the registry of shared generators, and per-thread canvas pools.
+import threading
+
+# For keeping track of least recently used canvases.
+from collections import OrderedDict
+
 # Pillow for Image processing.
-from PIL import Image, ImageDraw
+from PIL import Image, ImageColor, ImageDraw
 
 # For decoding hex values (works both for Python 2.7.x and Python 3.x).
 import binascii
 
+# For embedding identicons as data URIs.
+import base64
+
+# For pre-compressing text identicons, and fingerprinting generators.
+import gzip
+import json
+
+# For detecting integer inputs (including NumPy integers).
+import numbers
+
+# For streaming PNG encoder.
+import struct
+import zlib
+
+# Brotli is optional, and only used for pre-compressing text identicons.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# NumPy is optional, and only used for producing array output.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Library imports.
+from pydenticon.cache import RenderCache
+
+
+# Output formats that return the rendered identicon without encoding it.
+UNENCODED_FORMATS = ("image", "raw", "numpy")
+
+# Prefix of output formats that return the identicon as a data URI. The rest of
+# the output format specifies format of the embedded identicon, for example
+# "data-uri:png".
+DATA_URI_PREFIX = "data-uri:"
+
+# PNG file signature.
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Amount of compressed data buffered before writing out a PNG IDAT chunk.
+PNG_CHUNK_SIZE = 65536
+
+# Output formats that are worth compressing for transfer.
+COMPRESSIBLE_FORMATS = ("ascii", "svg")
+
+# Number of compressed variants cached by generators without a cache.
+COMPRESSED_CACHE_SIZE = 1024
+
+# MIME types of formats not handled by Pillow.
+MIME_TYPES = {"svg": "image/svg+xml", "ascii": "text/plain"}
+
+# Cache of data URI prefixes, keyed by embedded format.
+_data_uri_prefixes = {}
+
+
+def _data_uri_prefix(image_format):
+    """
+    Returns data URI prefix (including the base64 marker) for passed format.
+    """
+
+    prefix = _data_uri_prefixes.get(image_format)
+
+    if prefix is None:
+        if image_format in UNENCODED_FORMATS:
+            raise ValueError("Unencoded image format cannot be used for data URI: %s" % image_format)
+
+        mime_type = MIME_TYPES.get(image_format)
+
+        if mime_type is None:
+            Image.init()
+            mime_type = Image.MIME.get(image_format.upper())
+
+        if mime_type is None:
+            raise ValueError("Cannot determine MIME type of requested image format: %s" % image_format)
+
+        prefix = _data_uri_prefixes[image_format] = "data:%s;base64," % mime_type
+
+    return prefix
+
+
+def _to_data_uri(raw, image_format):
+    """
+    Converts raw identicon in passed format into a data URI.
+    """
+
+    prefix = _data_uri_prefix(image_format)
+
+    if not isinstance(raw, bytes):
+        raw = raw.encode("utf-8")
+
+    return prefix + base64.b64encode(raw).decode("ascii")
+
+
+# Constants of the SplitMix64 integer hash.
+SPLITMIX64_GAMMA = 0x9e3779b97f4a7c15
+SPLITMIX64_MULTIPLIERS = (0xbf58476d1ce4e5b9, 0x94d049bb133111eb)
+UINT64_MASK = 0xffffffffffffffff
+
+
+def _splitmix64(value):
+    """
+    Mixes a 64-bit integer using SplitMix64 finaliser.
+    """
+
+    value = (value ^ (value >> 30)) * SPLITMIX64_MULTIPLIERS[0] & UINT64_MASK
+    value = (value ^ (value >> 27)) * SPLITMIX64_MULTIPLIERS[1] & UINT64_MASK
+
+    return value ^ (value >> 31)
+
+
+def _is_integer(value):
+    """
+    Checks if value is an integer (including NumPy integers). Booleans are
+    not treated as integers.
+    """
+
+    return isinstance(value, numbers.Integral) and not isinstance(value, bool)
+
+
+def _integer_to_uint64(value):
+    """
+    Converts integer to unsigned 64-bit value. Negative integers are
+    interpreted as signed 64-bit values.
+    """
+
+    if not _is_integer(value):
+        raise ValueError("Integer hash accepts only integers, got %r" % (value,))
+
+    value = int(value)
+
+    if not -2 ** 63 <= value < 2 ** 64:
+        raise ValueError("Integer input %d does not fit into 64 bits" % value)
+
+    return value & UINT64_MASK
+
+
+def splitmix64_digest(value):
+    """
+    Calculates 16-byte digest of a 64-bit integer using first two outputs of
+    the SplitMix64 generator seeded with the integer.
+
+    Arguments:
+
+      value - Integer between -2**63 and 2**64 - 1. Negative integers are
+      interpreted as signed 64-bit values.
+
+    Returns:
+
+      Digest as bytes.
+    """
+
+    state = _integer_to_uint64(value)
+
+    first = _splitmix64((state + SPLITMIX64_GAMMA) & UINT64_MASK)
+    second = _splitmix64((state + 2 * SPLITMIX64_GAMMA) & UINT64_MASK)
+
+    return binascii.unhexlify("%016x%016x" % (first, second))
+
+
+def splitmix64_digests(values):
+    """
+    Vectorised version of splitmix64_digest() function. Requires NumPy.
+
+    Arguments:
+
+      values - Sequence (or NumPy array) of integers between -2**63 and
+      2**64 - 1.
+
+    Returns:
+
+      NumPy array of unsigned bytes with shape (len(values), 16), where every
+      row holds the digest of corresponding integer.
+    """
+
+    if numpy is None:
+        raise ValueError("NumPy is required for vectorised integer hashing")
+
+    if isinstance(values, numpy.ndarray) and values.dtype.kind in "iu":
+        # Signed integers wrap around to their unsigned 64-bit equivalents.
+        state = values.astype(numpy.uint64).ravel()
+    elif isinstance(values, numpy.ndarray) and values.dtype.kind != "O":
+        raise ValueError("Unsupported array type for integer hashing: %s" % values.dtype)
+    else:
+        # Converting mixed signed and unsigned Python integers directly could
+        # end-up with a lossy floating point array.
+        state = numpy.array([_integer_to_uint64(value) for value in values], dtype=numpy.uint64)
+
+    digests = numpy.empty((len(state), 2), dtype=">u8")
+
+    # Unsigned NumPy arithmetic wraps around on overflow, same as the masking
+    # in pure Python version.
+    for i, offset in enumerate((SPLITMIX64_GAMMA, 2 * SPLITMIX64_GAMMA & UINT64_MASK)):
+        value = state + numpy.uint64(offset)
+        value = (value ^ (value >> numpy.uint64(30))) * numpy.uint64(SPLITMIX64_MULTIPLIERS[0])
+        value = (value ^ (value >> numpy.uint64(27))) * numpy.uint64(SPLITMIX64_MULTIPLIERS[1])
+        digests[:, i] = value ^ (value >> numpy.uint64(31))
+
+    return digests.view(numpy.uint8).reshape(len(state), 16)
+
+
+# Integer hashes that can be selected by name.
+INTEGER_HASHES = {"splitmix64": splitmix64_digest}
+
+
+def select_encoding(accept_encoding):
+    """
+    Selects content encoding for pre-compressed identicons based on value of
+    HTTP Accept-Encoding header. Brotli is selected only if the brotli module
+    is installed. Brotli is preferred over gzip if client accepts both with
+    same quality.
+
+    Arguments:
+
+      accept_encoding - Value of Accept-Encoding header, or None.
+
+    Returns:
+
+      Either "br", "gzip", or None (no compression).
+    """
+
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+
+    for element in accept_encoding.split(","):
+        parameters = element.strip().split(";")
+        coding = parameters[0].strip().lower()
+        quality = 1.0
+
+        for parameter in parameters[1:]:
+            name, _, value = parameter.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        qualities[coding] = quality
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best_encoding, best_quality = None, 0.0
+
+    for encoding in candidates:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+
+    return best_encoding
+
+
+def _compress(raw, encoding):
+    """
+    Compresses raw identicon using passed content encoding.
+
+    Arguments:
+
+      raw - Rendered identicon (bytes or string). Strings are encoded using
+      UTF-8 prior to compression.
+
+      encoding - Content encoding, either "br", "gzip", or None (no
+      compression).
+
+    Returns:
+
+      Compressed identicon as bytes.
+    """
+
+    if not isinstance(raw, bytes):
+        raw = raw.encode("utf-8")
+
+    if encoding is None:
+        return raw
+    elif encoding == "gzip":
+        # Fixed modification time keeps the result deterministic.
+        return gzip.compress(raw, mtime=0)
+    elif encoding == "br" and brotli is not None:
+        return brotli.compress(raw)
+
+    raise ValueError("Unsupported content encoding: %s" % encoding)
+
 
 class Generator(object):
     """
@@ -33,9 +322,14 @@ class Generator(object):
 
     Simply put, the generated identicons are small symmetric mosaics with
     optional padding.
+
+    Generator instances are not modified after initialisation, and can be
+    safely shared between threads. Use the get_generator() function in order
+    to obtain shared instances.
     """
 
-    def __init__(self, rows, columns, digest=hashlib.md5, foreground=["#000000"], background="#ffffff"):
+    def __init__(self, rows, columns, digest=hashlib.md5, foreground=["#000000"], background="#ffffff", canvas_pool=None,
+                 cache=None, integer_hash=None):
         """
         Initialises an instance of identicon generator. The instance can be used
         for creating identicons with differing image formats, sizes, and with
@@ -63,6 +357,21 @@ class Generator(object):
           background - Colour (single) which should be used for background and
           padding, represented as a string of format supported by the
           PIL.ImageColor module. Default is "#ffffff" (white).
+
+          canvas_pool - Instance of CanvasPool class that should be used for
+          obtaining canvases to draw on, instead of allocating a new image for
+          every identicon. Default is None (no pooling).
+
+          cache - Cache (for example pydenticon.cache.RenderCache instance)
+          that should be used for storing rendered identicons. Only encoded
+          results are cached. Default is None (no caching).
+
+          integer_hash - Hash used for integer data. Either "splitmix64" (fast
+          hash that can be vectorised, see identicons_from_integers() method),
+          or a function accepting an integer and returning a digest as bytes
+          (at least 16 bytes). Default is None, in which case integers are
+          converted to strings and hashed using the digest, producing the same
+          identicons as their string representations.
         """
 
         # Check if the digest produces sufficient entropy for identicon
@@ -85,6 +394,58 @@ class Generator(object):
 
         self.digest = digest
 
+        if integer_hash is not None and integer_hash not in INTEGER_HASHES and not callable(integer_hash):
+            raise ValueError("Unsupported integer hash: %s" % integer_hash)
+
+        self.canvas_pool = canvas_pool
+        self.cache = cache
+        self.integer_hash = integer_hash
+
+        self._fingerprint = None
+
+        # Compressed variants are cached even without generator cache, since
+        # they are normally requested over and over by web servers.
+        self._compressed_cache = RenderCache(COMPRESSED_CACHE_SIZE)
+
+        # Pre-calculate the layout of cells used when generating the matrix,
+        # since it depends only on the number of rows and columns. Each element
+        # contains digest byte index and bit shift for the cell, followed by
+        # coordinates of the cell and its reflection in the matrix. The first
+        # digest byte is skipped, since it is used for the foreground colour.
+        half_columns = columns // 2 + columns % 2
+        self._cell_layout = [(1 + cell // 8, 7 - cell % 8, cell % rows, cell // columns, columns - cell // columns - 1)
+                             for cell in range(rows * half_columns)]
+
+        # Pre-calculate SVG fill attributes for all the colours, since they
+        # depend only on the configured colours.
+        self._svg_fills = dict((colour, self._svg_fill(colour)) for colour in list(foreground) + [background])
+
+    @property
+    def fingerprint(self):
+        """
+        Fingerprint of generator configuration (rows, columns, digest,
+        colours, and integer hash), represented as hex string. Generators with
+        the same fingerprint produce identical identicons.
+        """
+
+        if self._fingerprint is None:
+            configuration = {
+                "rows": self.rows,
+                "columns": self.columns,
+                "digest": getattr(self.digest(b""), "name", repr(self.digest)),
+                "foreground": [ImageColor.getrgb(colour) for colour in self.foreground],
+                "background": ImageColor.getrgb(self.background),
+                }
+
+            # Integer hash is left out by default, so that fingerprints stay
+            # the same as for generators without the option.
+            if self.integer_hash is not None:
+                configuration["integer_hash"] = getattr(self.integer_hash, "__name__", self.integer_hash)
+
+            self._fingerprint = hashlib.sha256(json.dumps(configuration, sort_keys=True).encode("utf-8")).hexdigest()
+
+        return self._fingerprint
+
     def _get_bit(self, n, hash_bytes):
         """
         Determines if the n-th bit of passed bytes is 1 or 0.
@@ -120,30 +481,19 @@ class Generator(object):
           should be used.
         """
 
-        # Since the identicon needs to be symmetric, we'll need to work on half
-        # the columns (rounded-up), and reflect where necessary.
-        half_columns = self.columns // 2 + self.columns % 2
-        cells = self.rows * half_columns
-
         # Initialise the matrix (list of rows) that will be returned.
         matrix = [[False] * self.columns for _ in range(self.rows)]
 
-        # Process the cells one by one.
-        for cell in range(cells):
+        # Process the cells one by one. Since the identicon needs to be
+        # symmetric, the layout covers only half the columns (rounded-up).
+        for byte_index, shift, row, column, reflected_column in self._cell_layout:
 
             # If the bit from hash correpsonding to this cell is 1, mark the
-            # cell as foreground one. Do not use first byte (since that one is
-            # used for determining the foreground colour.
-            if self._get_bit(cell, hash_bytes[1:]):
-
-                # Determine the cell coordinates in matrix.
-                column = cell // self.columns
-                row = cell % self.rows
-
-                # Mark the cell and its reflection. Central column may get
-                # marked twice, but we don't care.
+            # cell and its reflection as foreground ones. Central column may get
+            # marked twice, but we don't care.
+            if hash_bytes[byte_index] >> shift & 1:
                 matrix[row][column] = True
-                matrix[row][self.columns - column - 1] = True
+                matrix[row][reflected_column] = True
 
         return matrix
 
@@ -159,7 +509,8 @@ class Generator(object):
         Arguments:
 
           data - Raw data or hex string representation of existing digest for
-          which a list of one-byte digest values should be returned.
+          which a list of one-byte digest values should be returned. Integer
+          data is hashed according to the integer hash of generator.
 
         Returns:
 
@@ -167,6 +518,17 @@ class Generator(object):
           repesents a single byte of a data digest.
         """
 
+        if _is_integer(data):
+            if self.integer_hash is None:
+                data = str(int(data))
+            else:
+                integer_digest = INTEGER_HASHES.get(self.integer_hash, self.integer_hash)(data)
+
+                if len(integer_digest) < 16:
+                    raise ValueError("Integer hash must provide at least 16 bytes, got %d" % len(integer_digest))
+
+                return list(bytearray(integer_digest[:16]))
+
         # If data seems to provide identical amount of entropy as digest, it
         # could be a hex digest already.
         if len(data) // 2 == self.digest_entropy // 8:
@@ -213,15 +575,50 @@ class Generator(object):
           module.
 
           image_format - Format to use for the image. Format needs to be
-          supported by the Pillow library.
+          supported by the Pillow library, or be one of the unencoded formats
+          ("image", "raw", or "numpy").
 
         Returns:
 
-          Identicon image in requested format, returned as a byte list.
+          Identicon image in requested format, returned as a byte list. For
+          unencoded formats ("image", "raw", and "numpy"), the result is
+          returned as documented for the generate() method.
         """
 
+        image = self._draw_image(matrix, width, height, padding, foreground, background, image_format)
+
+        # Skip encoding altogether if caller wants an unencoded result. Pooled
+        # canvases must not be handed out to the caller.
+        if image_format in UNENCODED_FORMATS:
+            if self.canvas_pool is not None and image_format == "image":
+                image = image.copy()
+
+            return self._image_to_unencoded(image, image_format)
+
+        return self._encode_image(image, image_format)
+
+    def _draw_image(self, matrix, width, height, padding, foreground, background, image_format):
+        """
+        Draws the identicon blocks onto a canvas (new or pooled Pillow image).
+        Refer to _generate_image() method for description of arguments.
+
+        Returns:
+
+          Pillow image with drawn identicon. Pooled canvases are returned
+          as-is, and must not be handed out to the caller.
+        """
+
+        size = (width + padding[2] + padding[3], height + padding[0] + padding[1])
+
         # Set-up a new image object, setting the background to provided value.
-        image = Image.new("RGBA", (width + padding[2] + padding[3], height + padding[0] + padding[1]), background)
+        # Pooled canvases for JPEG are taken in RGB mode straight away, since
+        # alpha channel would be dropped during conversion anyway.
+        if self.canvas_pool is None:
+            image = Image.new("RGBA", size, background)
+        elif image_format.upper() == "JPEG":
+            image = self.canvas_pool.checkout(size, "RGB", background)
+        else:
+            image = self.canvas_pool.checkout(size, "RGBA", background)
 
         # Set-up a draw image (for drawing the blocks).
         draw = ImageDraw.Draw(image)
@@ -243,10 +640,28 @@ class Generator(object):
                     # Draw the rectangle.
                     draw.rectangle((x1, y1, x2, y2), fill=foreground)
 
+        return image
+
+    def _encode_image(self, image, image_format):
+        """
+        Encodes drawn identicon image into requested image format.
+
+        Arguments:
+
+          image - Pillow image with drawn identicon.
+
+          image_format - Format to use for the image. Format needs to be
+          supported by the Pillow library.
+
+        Returns:
+
+          Identicon image in requested format, returned as a byte list.
+        """
+
         # Set-up a stream where image will be saved.
         stream = BytesIO()
 
-        if image_format.upper() == "JPEG":
+        if image_format.upper() == "JPEG" and image.mode != "RGB":
             image = image.convert(mode="RGB")
 
         # Save the image to stream.
@@ -260,6 +675,34 @@ class Generator(object):
         # Return the resulting image.
         return image_raw
 
+    def _image_to_unencoded(self, image, image_format):
+        """
+        Converts a drawn identicon image into one of the unencoded output
+        formats.
+
+        Arguments:
+
+          image - Pillow image (RGBA mode) holding the drawn identicon.
+
+          image_format - One of the unencoded formats: "image", "raw", or
+          "numpy".
+
+        Returns:
+
+          Pillow image for "image" format, a tuple (mode, (width, height),
+          pixel bytes) for "raw" format, or a NumPy array of shape (height,
+          width, 4) for "numpy" format.
+        """
+
+        if image_format == "image":
+            return image
+        elif image_format == "raw":
+            return (image.mode, image.size, image.tobytes())
+        elif numpy is None:
+            raise ValueError("NumPy must be installed in order to use the numpy output format")
+
+        return numpy.asarray(image)
+
     def _generate_ascii(self, matrix, foreground, background):
         """
         Generates an identicon "image" in the ASCII format. The image will just
@@ -284,6 +727,65 @@ class Generator(object):
 
         return "\n".join(["".join([foreground if cell else background for cell in row]) for row in matrix])
 
+    def _generate_svg(self, matrix, width, height, padding, foreground, background):
+        """
+        Generates an identicon image in the SVG format. Arguments are identical
+        to the ones of _generate_image() method.
+
+        The background is drawn with the foreground blocks cut out of it, so
+        semi-transparent colours are not blended, same as in the raster
+        formats.
+
+        Returns:
+
+          SVG image as a string.
+        """
+
+        # Calculate the block widht and height.
+        block_width = width // self.columns
+        block_height = height // self.rows
+
+        # Set-up outlines of all foreground blocks as sub-paths.
+        blocks = "".join(["M%d %dh%dv%dh-%dz" % (padding[2] + column * block_width, padding[0] + row * block_height,
+                                                 block_width, block_height, block_width)
+                          for row, row_columns in enumerate(matrix)
+                          for column, cell in enumerate(row_columns) if cell])
+
+        total_width = width + padding[2] + padding[3]
+        total_height = height + padding[0] + padding[1]
+
+        # Fill attributes of generator colours are pre-calculated.
+        foreground_fill = self._svg_fills.get(foreground) or self._svg_fill(foreground)
+        background_fill = self._svg_fills.get(background) or self._svg_fill(background)
+
+        return ('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" shape-rendering="crispEdges">'
+                '<path fill-rule="evenodd" %s d="M0 0h%dv%dh-%dz%s"/>%s</svg>' %
+                (total_width, total_height, background_fill, total_width, total_height, total_width, blocks,
+                 '<path %s d="%s"/>' % (foreground_fill, blocks) if blocks else ""))
+
+    def _svg_fill(self, colour):
+        """
+        Converts colour into SVG fill attributes. Used for pre-calculating
+        fill attributes of generator colours on initialisation.
+
+        Arguments:
+
+          colour - Colour represented as a string of format supported by the
+          PIL.ImageColor module.
+
+        Returns:
+
+          String with fill (and, if necessary, fill-opacity) attributes.
+        """
+
+        rgba = ImageColor.getrgb(colour)
+        fill = 'fill="#%02x%02x%02x"' % rgba[:3]
+
+        if len(rgba) == 4 and rgba[3] != 255:
+            fill += ' fill-opacity="%.4f"' % (rgba[3] / 255.0)
+
+        return fill
+
     def generate(self, data, width, height, padding=(0, 0, 0, 0), output_format="png", inverted=False):
         """
         Generates an identicon image with requested width, height, padding, and
@@ -306,29 +808,97 @@ class Generator(object):
 
           output_format - Output format of resulting identicon image. Supported
           formats are anything that is supported by Pillow, plus a special
-          "ascii" mode.
+          "ascii" mode, and "svg" (returned as a string). Any of the formats
+          can be returned as a data URI string by prefixing it with
+          "data-uri:", for example "data-uri:png". Unencoded results, useful
+          for compositing identicons into other images in-process, can be
+          obtained with "image" (Pillow image in RGBA mode), "raw" (tuple
+          consisting out of image mode, image size as (width, height) tuple,
+          and raw pixel bytes), and "numpy" (NumPy array of shape (height,
+          width, 4), available only if NumPy is installed).
 
           inverted - Specifies whether the block colours should be inverted or
           not. Default is False.
 
         Returns:
 
-          Byte representation of an identicon image.
+          Byte representation of an identicon image, or unencoded result if
+          one of the unencoded formats was requested.
         """
 
+        # Cached identicons are looked-up by identicon key.
+        if self.cache is not None and output_format not in UNENCODED_FORMATS:
+            return self.identicon(data).render(width, height, padding, output_format, inverted)
+
         # Calculate the digest, and get byte list.
         digest_byte_list = self._data_to_digest_byte_list(data)
 
         # Create the matrix describing which block should be filled-in.
         matrix = self._generate_matrix(digest_byte_list)
 
+        return self._render(matrix, digest_byte_list[0], width, height, padding, output_format, inverted)
+
+    def generate_compressed(self, data, width, height, padding=(0, 0, 0, 0), output_format="svg", inverted=False,
+                            accept_encoding=None):
+        """
+        Generates an identicon, compressed according to passed value of HTTP
+        Accept-Encoding header. Only text formats (see COMPRESSIBLE_FORMATS)
+        get compressed. Compressed variants are kept in generator cache or,
+        if generator has no cache, in a small cache holding the most recently
+        used COMPRESSED_CACHE_SIZE variants, so every identicon is compressed
+        only once (as long as it stays in the cache).
+
+        Arguments:
+
+          data, width, height, padding, output_format, inverted - Identical
+          to the arguments of generate() method. Output format must not be one
+          of the unencoded formats. Default output format is "svg".
+
+          accept_encoding - Value of Accept-Encoding header. Default is None
+          (no compression).
+
+        Returns:
+
+          Tuple consisting out of identicon as bytes, and applied content
+          encoding ("br", "gzip", or None if not compressed).
+        """
+
+        encoding = select_encoding(accept_encoding) if output_format in COMPRESSIBLE_FORMATS else None
+
+        return self.identicon(data).render_compressed(width, height, padding, output_format, inverted, encoding), encoding
+
+    def _render(self, matrix, colour_byte, width, height, padding, output_format, inverted):
+        """
+        Renders an identicon out of already calculated block matrix. Refer to
+        generate() method for description of width, height, padding,
+        output_format, and inverted arguments.
+
+        Arguments:
+
+          matrix - Matrix describing which blocks in the identicon should be
+          painted with foreground (background if inverted) colour.
+
+          colour_byte - Digest byte (integer between 0 and 255) used for
+          picking the foreground colour.
+
+        Returns:
+
+          Identicon in requested output format.
+        """
+
+        if output_format.startswith(DATA_URI_PREFIX):
+            image_format = output_format[len(DATA_URI_PREFIX):]
+            raw = self._render(matrix, colour_byte, width, height, padding, image_format, inverted)
+
+            return _to_data_uri(raw, image_format)
+
         # Determine the background and foreground colours.
         if output_format == "ascii":
             foreground = "+"
             background = "-"
         else:
             background = self.background
-            foreground = self.foreground[digest_byte_list[0] % len(self.foreground)]
+            foreground = self.foreground[colour_byte % len(self.foreground)]
 
         # Swtich the colours if inverted image was requested.
         if inverted:
@@ -337,5 +907,571 @@ class Generator(object):
         # Generate the identicon in requested format.
         if output_format == "ascii":
             return self._generate_ascii(matrix, foreground, background)
+        elif output_format == "svg":
+            return self._generate_svg(matrix, width, height, padding, foreground, background)
         else:
             return self._generate_image(matrix, width, height, padding, foreground, background, output_format)
+
+    def stream(self, data, stream, width, height, padding=(0, 0, 0, 0), inverted=False, compress_level=6):
+        """
+        Generates an identicon in PNG format, writing it into passed stream
+        one scanline at a time. The full image is never held in memory - every
+        block row is turned into a single scanline, which is then repeated for
+        the whole height of the block. Peak memory usage is therefore
+        proportional to the width of the image, and does not depend on its
+        height, which makes this method suitable for very large identicons.
+        Pixels of the resulting image are identical to the ones produced by
+        generate() method.
+
+        Arguments:
+
+          data, width, height, padding, inverted - Identical to the arguments
+          of generate() method.
+
+          stream - File-like object, opened in binary mode, into which the
+          PNG image should be written.
+
+          compress_level - Zlib compression level, between 0 and 9. Default
+          is 6.
+        """
+
+        digest_byte_list = self._data_to_digest_byte_list(data)
+        matrix = self._generate_matrix(digest_byte_list)
+
+        background = self.background
+        foreground = self.foreground[digest_byte_list[0] % len(self.foreground)]
+
+        if inverted:
+            foreground, background = background, foreground
+
+        self._stream_png(matrix, width, height, padding, foreground, background, stream, compress_level)
+
+    def _stream_png(self, matrix, width, height, padding, foreground, background, stream, compress_level):
+        """
+        Writes an identicon in PNG format (8-bit RGBA) into the stream, one
+        scanline at a time. Refer to _generate_image() and stream() methods
+        for description of arguments.
+        """
+
+        size = (width + padding[2] + padding[3], height + padding[0] + padding[1])
+
+        if size[0] <= 0 or size[1] <= 0:
+            raise ValueError("Identicon image must be at least one pixel in size, got %dx%d" % size)
+
+        foreground = bytes(bytearray(ImageColor.getcolor(foreground, "RGBA")))
+        background = bytes(bytearray(ImageColor.getcolor(background, "RGBA")))
+
+        # Calculate the block width and height.
+        block_width = width // self.columns
+        block_height = height // self.rows
+
+        def write_chunk(chunk_type, chunk_data):
+            stream.write(struct.pack(">I", len(chunk_data)))
+            stream.write(chunk_type)
+            stream.write(chunk_data)
+            stream.write(struct.pack(">I", zlib.crc32(chunk_type + chunk_data) & 0xffffffff))
+
+        # Header - 8-bit depth, RGBA colour type, no interlacing.
+        stream.write(PNG_SIGNATURE)
+        write_chunk(b"IHDR", struct.pack(">IIBBBBB", size[0], size[1], 8, 6, 0, 0, 0))
+
+        compressor = zlib.compressobj(compress_level)
+        compressed = bytearray()
+
+        def write_rows(scanline, count):
+            for _ in range(count):
+                compressed.extend(compressor.compress(scanline))
+
+                if len(compressed) >= PNG_CHUNK_SIZE:
+                    write_chunk(b"IDAT", bytes(compressed))
+                    del compressed[:]
+
+        # Every scanline starts with filter type byte (no filtering).
+        background_scanline = b"\x00" + background * size[0]
+
+        write_rows(background_scanline, padding[0])
+
+        for row_columns in matrix:
+            scanline = [b"\x00", background * padding[2]]
+            scanline.extend((foreground if cell else background) * block_width for cell in row_columns)
+            scanline.append(background * (size[0] - padding[2] - len(row_columns) * block_width))
+
+            write_rows(b"".join(scanline), block_height)
+
+        # Rows not covered by blocks (if height is not divisible by number of
+        # rows), followed by bottom padding.
+        write_rows(background_scanline, size[1] - padding[0] - len(matrix) * block_height)
+
+        compressed.extend(compressor.flush())
+        write_chunk(b"IDAT", bytes(compressed))
+        write_chunk(b"IEND", b"")
+
+    def embed(self, inputs, width, height, padding=(0, 0, 0, 0), image_format="png", inverted=False, html=False):
+        """
+        Generates identicons for a batch of inputs as ready-to-embed data URIs
+        (or HTML image tags). Identicons that look the same are encoded only
+        once per batch.
+
+        Arguments:
+
+          inputs - Iterable of hashed or raw data for which identicons should
+          be generated.
+
+          width, height, padding, inverted - Identical to the arguments of
+          generate() method.
+
+          image_format - Format of embedded images. Any format supported by
+          generate() method that produces raw data (for example "png" or
+          "svg"). Special format "smallest" embeds whichever of "svg" and "png"
+          produces shorter data URI for every identicon. Default is "png".
+
+          html - Whether to return HTML image tags instead of data URIs.
+          Default is False.
+
+        Returns:
+
+          List of data URIs (or HTML image tags), one for every input.
+        """
+
+        formats = ("svg", "png") if image_format == "smallest" else (image_format,)
+        embedded = {}
+        results = []
+
+        for data in inputs:
+            identicon = self.identicon(data)
+            key = identicon.key
+            result = embedded.get(key)
+
+            if result is None:
+                result = min([identicon.render(width, height, padding, DATA_URI_PREFIX + embedded_format, inverted)
+                              for embedded_format in formats], key=len)
+
+                if html:
+                    result = '<img src="%s" width="%d" height="%d" alt="">' % (result, width + padding[2] + padding[3],
+                                                                               height + padding[0] + padding[1])
+
+                embedded[key] = result
+
+            results.append(result)
+
+        return results
+
+    def identicon(self, data):
+        """
+        Creates a lazy identicon object for the passed data. Digest, block
+        matrix, foreground colour, and identicon key are calculated only when
+        accessed, and rendered results are memoized on the returned object.
+
+        Arguments:
+
+          data - Hashed or raw data that will be used for generating the
+          identicon.
+
+        Returns:
+
+          Instance of Identicon class.
+        """
+
+        return Identicon(self, data)
+
+    def identicon_from_digest(self, digest):
+        """
+        Creates a lazy identicon object out of an already calculated digest,
+        skipping both the digest calculation and hex decoding. The result is
+        identical to the one obtained by passing the hex representation of the
+        digest to the identicon() method.
+
+        Arguments:
+
+          digest - Digest as bytes-like object (for example bytes, bytearray,
+          or memoryview). Memoryview digests are used without copying. Digest
+          must provide at least 16 bytes - any bytes past the 16th one are
+          ignored.
+
+        Returns:
+
+          Instance of Identicon class, with digest as its data.
+        """
+
+        if len(digest) < 16:
+            raise ValueError("Passed digest must have at least 16 bytes, got %d" % len(digest))
+
+        identicon = Identicon(self, digest)
+        identicon._digest_byte_list = digest[:16]
+
+        return identicon
+
+    def identicons_from_integers(self, values):
+        """
+        Creates lazy identicon objects for a batch of integers (for example
+        user IDs). With "splitmix64" integer hash and NumPy available, digests
+        for the whole batch are calculated at once. Results are identical to
+        the ones obtained by passing integers to the identicon() method one by
+        one.
+
+        Arguments:
+
+          values - Sequence (or NumPy array) of integers. ValueError is raised
+          if any of the values is not an integer.
+
+        Returns:
+
+          List of Identicon instances, one for every integer.
+        """
+
+        # Values are read more than once, which would exhaust iterators.
+        if numpy is None or not isinstance(values, numpy.ndarray):
+            values = list(values)
+
+        if self.integer_hash != "splitmix64" or numpy is None:
+            for value in values:
+                if not _is_integer(value):
+                    raise ValueError("Expected integer values, got %r" % (value,))
+
+            return [self.identicon(value) for value in values]
+
+        digests = memoryview(splitmix64_digests(values).tobytes())
+        identicons = []
+
+        for i, value in enumerate(values.ravel() if isinstance(values, numpy.ndarray) else values):
+            identicon = self.identicon_from_digest(digests[i * 16:(i + 1) * 16])
+            identicon.data = value
+            identicons.append(identicon)
+
+        return identicons
+
+
+class CanvasPool(object):
+    """
+    Pool of reusable canvases (Pillow images) for drawing the identicons.
+
+    Every thread gets its own set of canvases, keyed by canvas size, mode, and
+    background colour. Instead of allocating a new image for every identicon,
+    a canvas is reset by pasting a pre-built blank image (filled with
+    background colour) over it. This cuts down on memory churn when generating
+    lots of identicons under high concurrency.
+
+    Canvases never leave the pool - encoded identicons are independent of the
+    canvas they were drawn on, while unencoded results are copied out.
+
+    A single pool can be shared between multiple generators.
+    """
+
+    def __init__(self, max_canvases=8):
+        """
+        Initialises the pool.
+
+        Arguments:
+
+          max_canvases - Maximum number of canvases kept per thread. Least
+          recently used canvases are dropped once the limit is reached. Default
+          is 8.
+        """
+
+        self.max_canvases = max_canvases
+        self._local = threading.local()
+
+    def checkout(self, size, mode, background):
+        """
+        Returns a canvas filled with background colour. The canvas may be used
+        by calling thread only until the next call to this method.
+
+        Arguments:
+
+          size - Size of canvas as (width, height) tuple.
+
+          mode - Pillow image mode of the canvas.
+
+          background - Background colour of the canvas, represented as a string
+          of format supported by the PIL.ImageColor module.
+
+        Returns:
+
+          Pillow image.
+        """
+
+        canvases = getattr(self._local, "canvases", None)
+        if canvases is None:
+            canvases = self._local.canvases = OrderedDict()
+
+        key = (size, mode, background)
+        entry = canvases.pop(key, None)
+
+        if entry is None:
+            blank = Image.new(mode, size, background)
+            canvas = blank.copy()
+
+            if len(canvases) >= self.max_canvases:
+                canvases.popitem(last=False)
+        else:
+            canvas, blank = entry
+            canvas.paste(blank)
+
+        canvases[key] = (canvas, blank)
+
+        return canvas
+
+
+# Shared generators, keyed by normalised configuration.
+_generators = {}
+_generators_lock = threading.Lock()
+
+
+def get_generator(rows, columns, digest=hashlib.md5, foreground=["#000000"], background="#ffffff", canvas_pool=None,
+                  cache=None, integer_hash=None):
+    """
+    Returns a shared generator instance for the passed configuration, creating
+    it if necessary. Generators are interned by normalised configuration, so
+    configurations that differ only in notation of colours (for example
+    "#fff" and "white") share the same generator. Any state derived from
+    configuration is therefore calculated only once per process.
+
+    Function is thread-safe. Arguments are identical to the ones accepted by
+    Generator class.
+
+    Returns:
+
+      Generator instance.
+    """
+
+    key = (rows, columns, digest, tuple(ImageColor.getrgb(colour) for colour in foreground), ImageColor.getrgb(background),
+           canvas_pool, cache, integer_hash)
+
+    # Avoid taking the lock for already registered generators.
+    generator = _generators.get(key)
+
+    if generator is None:
+        with _generators_lock:
+            generator = _generators.get(key)
+
+            if generator is None:
+                generator = Generator(rows, columns, digest=digest, foreground=list(foreground), background=background,
+                                      canvas_pool=canvas_pool, cache=cache, integer_hash=integer_hash)
+                _generators[key] = generator
+
+    return generator
+
+
+def warm_generators(configurations):
+    """
+    Creates shared generators for all passed configurations in advance. This
+    is normally done during application start-up in order to avoid paying for
+    the generator set-up while serving requests.
+
+    Arguments:
+
+      configurations - Iterable of dictionaries, where each dictionary
+      contains keyword arguments for the get_generator() function.
+
+    Returns:
+
+      List of shared generators, in the same order as configurations.
+    """
+
+    return [get_generator(**configuration) for configuration in configurations]
+
+
+def clear_generators():
+    """
+    Removes all shared generators from the registry.
+    """
+
+    with _generators_lock:
+        _generators.clear()
+
+
+class Identicon(object):
+    """
+    Lazily evaluated identicon for a single piece of data, bound to the
+    generator that created it.
+
+    All of the intermediate results (digest bytes, block matrix, foreground
+    colour index, identicon key) are calculated on first access, and kept
+    around for subsequent accesses. Renders are memoized as well, so
+    rendering the same identicon multiple times (with same parameters) costs
+    only a lookup. Results that the caller could modify in-place (the
+    "image" and "numpy" output formats) are not memoized.
+
+    Instances should be obtained through Generator.identicon() method.
+    """
+
+    __slots__ = ("generator", "data", "_digest_byte_list", "_matrix", "_key", "_renders")
+
+    def __init__(self, generator, data):
+        """
+        Initialises the identicon.
+
+        Arguments:
+
+          generator - Generator instance used for producing the identicon.
+
+          data - Hashed or raw data that will be used for generating the
+          identicon.
+        """
+
+        self.generator = generator
+        self.data = data
+
+        self._digest_byte_list = None
+        self._matrix = None
+        self._key = None
+        self._renders = {}
+
+    @property
+    def digest_byte_list(self):
+        """
+        List of digest bytes (integers between 0 and 255) for the identicon
+        data.
+        """
+
+        if self._digest_byte_list is None:
+            self._digest_byte_list = self.generator._data_to_digest_byte_list(self.data)
+
+        return self._digest_byte_list
+
+    @property
+    def matrix(self):
+        """
+        Matrix describing which blocks of the identicon should be filled-in. The
+        matrix is shared between all users of the identicon, and should not be
+        modified.
+        """
+
+        if self._matrix is None:
+            self._matrix = self.generator._generate_matrix(self.digest_byte_list)
+
+        return self._matrix
+
+    @property
+    def foreground_index(self):
+        """
+        Index of the foreground colour in the list of generator foreground
+        colours.
+        """
+
+        return self.digest_byte_list[0] % len(self.generator.foreground)
+
+    @property
+    def foreground(self):
+        """
+        Foreground colour of the identicon.
+        """
+
+        return self.generator.foreground[self.foreground_index]
+
+    @property
+    def key(self):
+        """
+        Canonical key of the identicon, represented as hex string. Key
+        depends only on the block matrix and the foreground colour index, so
+        any two identicons produced by the same generator that have the same
+        key will also render identically.
+        """
+
+        if self._key is None:
+            bits = 0
+            for row in self.matrix:
+                for cell in row:
+                    bits = bits << 1 | (1 if cell else 0)
+
+            self._key = "%02x%0*x" % (self.foreground_index, (self.generator.rows * self.generator.columns + 3) // 4, bits)
+
+        return self._key
+
+    def _cached(self, parameters, render, cache):
+        """
+        Looks-up the result of rendering in memoized renders and passed
+        cache, rendering it if necessary.
+
+        Arguments:
+
+          parameters - Tuple of render parameters.
+
+          render - Function that renders the identicon.
+
+          cache - Cache in which the result should be looked-up and stored, or
+          None.
+
+        Returns:
+
+          Rendered identicon.
+        """
+
+        try:
+            return self._renders[parameters]
+        except KeyError:
+            pass
+
+        # Results that the caller could modify are neither memoized nor cached.
+        if parameters[3] in ("image", "numpy"):
+            return render()
+
+        result = None
+
+        if cache is not None and parameters[3] not in UNENCODED_FORMATS:
+            cache_key = (self.generator.fingerprint, self.key) + parameters
+            result = cache.get(cache_key)
+
+            if result is None:
+                result = render()
+                cache.set(cache_key, result)
+
+        if result is None:
+            result = render()
+
+        self._renders[parameters] = result
+
+        return result
+
+    def render(self, width, height, padding=(0, 0, 0, 0), output_format="png", inverted=False):
+        """
+        Renders the identicon. Arguments and return value are identical to
+        the ones of Generator.generate() method.
+        """
+
+        def render():
+            # Data URIs reuse the memoized render of embedded format.
+            if output_format.startswith(DATA_URI_PREFIX):
+                image_format = output_format[len(DATA_URI_PREFIX):]
+                return _to_data_uri(self.render(width, height, padding, image_format, inverted), image_format)
+
+            return self.generator._render(self.matrix, self.digest_byte_list[0], width, height, padding, output_format,
+                                          inverted)
+
+        return self._cached((width, height, tuple(padding), output_format, inverted), render, self.generator.cache)
+
+    def render_compressed(self, width, height, padding=(0, 0, 0, 0), output_format="svg", inverted=False, encoding=None):
+        """
+        Renders the identicon, compressing it using passed content encoding.
+        Compressed variants are stored in generator cache, or (if generator
+        has no cache) in a small cache dedicated to compressed variants.
+
+        Arguments:
+
+          width, height, padding, output_format, inverted - Identical to the
+          arguments of Generator.generate() method. Output format must not be
+          one of the unencoded formats.
+
+          encoding - Content encoding, either "br", "gzip", or None (no
+          compression).
+
+        Returns:
+
+          Compressed identicon as bytes. Text formats are encoded using UTF-8
+          prior to compression.
+        """
+
+        if output_format in UNENCODED_FORMATS:
+            raise ValueError("Unencoded image format cannot be compressed: %s" % output_format)
+
+        # Uncompressed variant is already memoized and cached as regular
+        # render.
+        if encoding is None:
+            return _compress(self.render(width, height, padding, output_format, inverted), None)
+
+        def render():
+            return _compress(self.render(width, height, padding, output_format, inverted), encoding)
+
+        cache = self.generator.cache if self.generator.cache is not None else self.generator._compressed_cache
+
+        return self._cached((width, height, tuple(padding), output_format, inverted, encoding), render, cache)
@@ -0,0 +1,965 @@
+"""
+Tools for processing large sets of identicon data in bulk.
+
+Only the first digest byte (foreground colour) and a limited number of digest
+bits (block matrix) determine what an identicon looks like, so large sets of
+data will normally contain many visually identical identicons. Functions in
+this module group the data by identicon key without rendering anything, and
+render every unique identicon only once.
+
+Rendered identicons can be exported either into a directory (DirectorySink),
+or into a single SQLite database (SQLiteSink), which avoids creating lots of
+small files. Identicons exported into SQLite database can be served using the
+SQLiteReader class.
+
+Repeated exports can be made incremental using incremental_render(), which
+keeps a manifest of previously exported identicons, and renders only new
+inputs, unless the configuration has changed.
+
+Digests exported as fixed-width binary records can be read using the
+DigestFile class, which memory-maps the file and feeds the records directly
+into identicon generation, without any decoding or copying.
+
+The module can also be run as a script in order to analyse (and optionally
+render) data read from a file, one entry per line::
+
+  python -m pydenticon.bulk --output-directory identicons/ users.txt
+"""
+
+# Standard library imports.
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import sys
+from collections import OrderedDict
+from io import BytesIO
+
+# Library imports.
+from pydenticon import get_generator
+
+
+def _group(identicons):
+    """
+    Groups identicons by key.
+
+    Arguments:
+
+      identicons - Iterable of (data, identicon) pairs.
+
+    Returns:
+
+      Ordered dictionary mapping identicon keys to lists of data.
+    """
+
+    groups = OrderedDict()
+
+    for data, identicon in identicons:
+        groups.setdefault(identicon.key, []).append(data)
+
+    return groups
+
+
+def group_by_key(generator, inputs):
+    """
+    Groups the passed data by identicon key. No identicons are rendered in the
+    process.
+
+    Arguments:
+
+      generator - Generator instance used for producing the identicons.
+
+      inputs - Iterable of hashed or raw data for which the identicons would
+      be generated.
+
+    Returns:
+
+      Ordered dictionary mapping identicon keys to lists of data producing
+      that identicon. Keys are ordered by first appearance in the inputs.
+    """
+
+    return _group((data, generator.identicon(data)) for data in inputs)
+
+
+def group_digests_by_key(generator, digest_file):
+    """
+    Groups the records of a digest file by identicon key. No identicons are
+    rendered in the process.
+
+    Arguments:
+
+      generator - Generator instance used for producing the identicons.
+
+      digest_file - DigestFile instance.
+
+    Returns:
+
+      Ordered dictionary mapping identicon keys to lists of record indices
+      producing that identicon.
+    """
+
+    return _group(digest_file.identicons(generator))
+
+
+def collision_statistics(groups):
+    """
+    Calculates collision statistics for grouped data.
+
+    Arguments:
+
+      groups - Dictionary mapping identicon keys to lists of data, as returned
+      by the group_by_key() function.
+
+    Returns:
+
+      Dictionary with the following keys:
+
+        inputs - Total number of inputs.
+
+        unique - Number of unique identicons.
+
+        colliding_inputs - Number of inputs sharing their identicon with at
+        least one other input.
+
+        largest_group - Number of inputs in the largest group of inputs
+        sharing an identicon.
+
+        reduction - Ratio between number of inputs and number of unique
+        identicons, i.e. by how much rendering work is cut by rendering only
+        unique identicons.
+    """
+
+    sizes = [len(group) for group in groups.values()]
+    inputs = sum(sizes)
+
+    return {
+        "inputs": inputs,
+        "unique": len(sizes),
+        "colliding_inputs": sum(size for size in sizes if size > 1),
+        "largest_group": max(sizes) if sizes else 0,
+        "reduction": float(inputs) / len(sizes) if sizes else 1.0,
+        }
+
+
+class DirectorySink(object):
+    """
+    Export sink that stores every unique identicon as a separate file in a
+    directory, named after the identicon key. Mapping from inputs to file names
+    is written out as a JSON file when the sink is flushed or closed. Existing
+    mapping file is loaded on initialisation, and updated with new mappings.
+
+    Sink can be used as a context manager, in which case it gets closed
+    automatically.
+    """
+
+    def __init__(self, directory, extension, mapping_file="mapping.json"):
+        """
+        Initialises the sink, creating the output directory if necessary, and
+        loading existing mapping file.
+
+        Arguments:
+
+          directory - Path to output directory.
+
+          extension - Extension to use for identicon files (without leading
+          dot).
+
+          mapping_file - Name of the mapping file, relative to output
+          directory. Default is "mapping.json".
+        """
+
+        self.directory = directory
+        self.extension = extension
+        self.mapping_file = mapping_file
+        self.mapping = OrderedDict()
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        mapping_path = os.path.join(directory, mapping_file)
+        if os.path.exists(mapping_path):
+            with open(mapping_path) as f:
+                self.mapping = json.load(f, object_pairs_hook=OrderedDict)
+
+    def _file_name(self, key):
+        """
+        Returns name of file used for storing identicon with passed key.
+        """
+
+        return "%s.%s" % (key, self.extension)
+
+    def __contains__(self, key):
+        """
+        Checks if identicon with passed key has already been stored.
+        """
+
+        return os.path.exists(os.path.join(self.directory, self._file_name(key)))
+
+    def store(self, key, identicon):
+        """
+        Stores rendered identicon.
+
+        Arguments:
+
+          key - Identicon key.
+
+          identicon - Rendered identicon. Text (ASCII) identicons are stored
+          using UTF-8 encoding.
+        """
+
+        if not isinstance(identicon, bytes):
+            identicon = identicon.encode("utf-8")
+
+        with open(os.path.join(self.directory, self._file_name(key)), "wb") as f:
+            f.write(identicon)
+
+    def map(self, data, key):
+        """
+        Records which identicon (key) should be used for passed data. Data is
+        converted to string, since mapping file is a JSON object (for example,
+        record indices are stored as strings).
+        """
+
+        self.mapping[str(data)] = self._file_name(key)
+
+    def unmap(self, data):
+        """
+        Removes mapping for passed data, if any.
+        """
+
+        self.mapping.pop(str(data), None)
+
+    def flush(self):
+        """
+        Writes out the mapping file.
+        """
+
+        with open(os.path.join(self.directory, self.mapping_file), "w") as f:
+            json.dump(self.mapping, f, indent=0)
+
+    def close(self):
+        """
+        Writes out the mapping file.
+        """
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteSink(object):
+    """
+    Export sink that stores identicons in a SQLite database. Every unique
+    identicon is stored once, keyed by identicon key, while inputs are mapped
+    to identicons in a separate table.
+
+    Writes are batched into transactions, and the database uses write-ahead
+    logging, so exporting lots of identicons does not incur the cost of a
+    commit per identicon. Pending writes are committed when the sink is
+    closed.
+
+    Sink can be used as a context manager, in which case it gets closed
+    automatically.
+    """
+
+    def __init__(self, path, batch_size=1000):
+        """
+        Initialises the sink, creating the database if necessary.
+
+        Arguments:
+
+          path - Path to SQLite database.
+
+          batch_size - Number of writes (identicons and mappings) to group into
+          a single transaction. Default is 1000.
+        """
+
+        self.path = path
+        self.batch_size = batch_size
+
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS identicons "
+                                 "(id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, data BLOB NOT NULL)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS inputs "
+                                 "(input PRIMARY KEY, identicon_id INTEGER NOT NULL REFERENCES identicons(id))")
+
+        self._pending_identicons = OrderedDict()
+        self._pending_inputs = OrderedDict()
+        self._pending_removals = OrderedDict()
+
+    def __contains__(self, key):
+        """
+        Checks if identicon with passed key has already been stored.
+        """
+
+        if key in self._pending_identicons:
+            return True
+
+        return self._connection.execute("SELECT 1 FROM identicons WHERE key = ?", (key,)).fetchone() is not None
+
+    def store(self, key, identicon):
+        """
+        Stores rendered identicon.
+
+        Arguments:
+
+          key - Identicon key.
+
+          identicon - Rendered identicon. Text (ASCII) identicons are stored
+          using UTF-8 encoding.
+        """
+
+        if not isinstance(identicon, bytes):
+            identicon = identicon.encode("utf-8")
+
+        self._pending_identicons[key] = identicon
+        self._flush_if_full()
+
+    def map(self, data, key):
+        """
+        Records which identicon (key) should be used for passed data.
+        """
+
+        self._pending_removals.pop(data, None)
+        self._pending_inputs[data] = key
+        self._flush_if_full()
+
+    def unmap(self, data):
+        """
+        Removes mapping for passed data, if any.
+        """
+
+        self._pending_inputs.pop(data, None)
+        self._pending_removals[data] = None
+        self._flush_if_full()
+
+    def _flush_if_full(self):
+        """
+        Flushes pending writes if the batch is full.
+        """
+
+        if len(self._pending_identicons) + len(self._pending_inputs) + len(self._pending_removals) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes out all pending identicons, mappings, and removals of mappings
+        in a single transaction. ValueError is raised (and nothing is written
+        out) if any of the inputs is mapped to an identicon that has not been
+        stored.
+        """
+
+        if not self._pending_identicons and not self._pending_inputs and not self._pending_removals:
+            return
+
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.executemany("INSERT INTO identicons (key, data) VALUES (?, ?) "
+                                         "ON CONFLICT (key) DO UPDATE SET data = excluded.data",
+                                         ((key, sqlite3.Binary(data)) for key, data in self._pending_identicons.items()))
+            cursor = self._connection.executemany("INSERT OR REPLACE INTO inputs (input, identicon_id) "
+                                                  "SELECT ?, id FROM identicons WHERE key = ?",
+                                                  self._pending_inputs.items())
+
+            # Mappings to identicons that were never stored insert nothing.
+            if cursor.rowcount != len(self._pending_inputs):
+                missing = sorted(set(key for key in self._pending_inputs.values()
+                                     if self._connection.execute("SELECT 1 FROM identicons WHERE key = ?",
+                                                                 (key,)).fetchone() is None))
+                raise ValueError("Inputs mapped to identicons that were not stored: %s" % ", ".join(missing))
+
+            self._connection.executemany("DELETE FROM inputs WHERE input = ?",
+                                         ((data,) for data in self._pending_removals))
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        self._connection.execute("COMMIT")
+
+        self._pending_identicons.clear()
+        self._pending_inputs.clear()
+        self._pending_removals.clear()
+
+    def close(self):
+        """
+        Writes out all pending changes, and closes the database.
+        """
+
+        try:
+            self.flush()
+        finally:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteReader(object):
+    """
+    Reader for identicons exported using SQLiteSink.
+
+    Identicons are served using incremental blob I/O where supported (Python
+    3.11 and later), without loading the whole blob into memory up-front.
+
+    Reader can be used as a context manager, in which case it gets closed
+    automatically.
+    """
+
+    def __init__(self, path):
+        """
+        Initialises the reader.
+
+        Arguments:
+
+          path - Path to SQLite database.
+        """
+
+        if not os.path.exists(path):
+            raise IOError("SQLite database does not exist: %s" % path)
+
+        self._connection = sqlite3.connect(path)
+
+    def _identicon_id(self, data=None, key=None):
+        """
+        Returns row ID of identicon for passed data or identicon key.
+
+        Raises:
+
+          KeyError - If there is no identicon for passed data or key.
+        """
+
+        if key is None:
+            row = self._connection.execute("SELECT identicon_id FROM inputs WHERE input = ?", (data,)).fetchone()
+        else:
+            row = self._connection.execute("SELECT id FROM identicons WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            raise KeyError(key if data is None else data)
+
+        return row[0]
+
+    def open(self, data=None, key=None):
+        """
+        Opens identicon for reading, looking it up either by data or by
+        identicon key.
+
+        Arguments:
+
+          data - Data for which the identicon was exported.
+
+          key - Identicon key. Takes precedence over data.
+
+        Returns:
+
+          File-like object for reading the identicon. It should be closed
+          once the identicon has been read.
+
+        Raises:
+
+          KeyError - If there is no identicon for passed data or key.
+        """
+
+        identicon_id = self._identicon_id(data, key)
+
+        if hasattr(self._connection, "blobopen"):
+            return self._connection.blobopen("identicons", "data", identicon_id, readonly=True)
+
+        row = self._connection.execute("SELECT data FROM identicons WHERE id = ?", (identicon_id,)).fetchone()
+
+        return BytesIO(bytes(row[0]))
+
+    def read(self, data=None, key=None):
+        """
+        Reads the whole identicon, looking it up either by data or by
+        identicon key. Arguments are identical to the ones of open() method.
+
+        Returns:
+
+          Identicon as bytes.
+        """
+
+        blob = self.open(data, key)
+        try:
+            return blob.read()
+        finally:
+            blob.close()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _render_unique(identicons, sink, width, height, padding, output_format, inverted):
+    """
+    Renders unique identicons into sink. Refer to render_unique() function for
+    description of arguments.
+
+    Arguments:
+
+      identicons - Iterable of (data, identicon) pairs.
+
+    Returns:
+
+      Collision statistics, as returned by collision_statistics() function.
+    """
+
+    groups = OrderedDict()
+
+    for data, identicon in identicons:
+        key = identicon.key
+        group = groups.get(key)
+
+        if group is None:
+            group = groups[key] = []
+
+            if key not in sink:
+                sink.store(key, identicon.render(width, height, padding, output_format, inverted))
+
+        group.append(data)
+        sink.map(data, key)
+
+    return collision_statistics(groups)
+
+
+def render_unique(generator, inputs, sink, width, height, padding=(0, 0, 0, 0), output_format="png", inverted=False):
+    """
+    Renders identicons for all passed data, rendering each unique identicon
+    only once. Rendered identicons, and mapping of data to them, are written
+    out to passed export sink.
+
+    Identicons already present in the sink are not rendered again.
+
+    Arguments:
+
+      generator - Generator instance used for producing the identicons.
+
+      inputs - Iterable of hashed or raw data for which the identicons should
+      be generated.
+
+      sink - Export sink (for example, DirectorySink) that stores the
+      identicons.
+
+      width, height, padding, output_format, inverted - Render parameters,
+      identical to ones accepted by Generator.generate() method.
+
+    Returns:
+
+      Collision statistics, as returned by collision_statistics() function.
+    """
+
+    return _render_unique(((data, generator.identicon(data)) for data in inputs), sink, width, height, padding,
+                          output_format, inverted)
+
+
+def render_unique_digests(generator, digest_file, sink, width, height, padding=(0, 0, 0, 0), output_format="png",
+                          inverted=False):
+    """
+    Renders identicons for all records of a digest file, rendering each unique
+    identicon only once. Records are mapped to identicons by record index.
+
+    Arguments are identical to the ones of render_unique() function, except
+    for digest_file, which should be a DigestFile instance.
+
+    Returns:
+
+      Collision statistics, as returned by collision_statistics() function.
+    """
+
+    return _render_unique(digest_file.identicons(generator), sink, width, height, padding, output_format, inverted)
+
+
+def configuration_fingerprint(generator, width, height, padding=(0, 0, 0, 0), output_format="png", inverted=False):
+    """
+    Calculates fingerprint of generator configuration and render parameters.
+    Any change that affects the rendered identicons (number of rows or
+    columns, colours, digest, size, padding, format, inversion) results in a
+    different fingerprint. Generator configuration is covered by
+    Generator.fingerprint.
+
+    Arguments:
+
+      generator - Generator instance used for producing the identicons.
+
+      width, height, padding, output_format, inverted - Render parameters,
+      identical to ones accepted by Generator.generate() method.
+
+    Returns:
+
+      Fingerprint as a hex string.
+    """
+
+    configuration = {
+        "generator": generator.fingerprint,
+        "width": width,
+        "height": height,
+        "padding": list(padding),
+        "output_format": output_format,
+        "inverted": inverted,
+        }
+
+    return hashlib.sha256(json.dumps(configuration, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Manifest(object):
+    """
+    Manifest of exported identicons. Manifest consists out of configuration
+    fingerprint, and an entry for every exported input, holding identicon key
+    and hash of the identicon content.
+    """
+
+    def __init__(self, fingerprint, entries=None):
+        """
+        Initialises the manifest.
+
+        Arguments:
+
+          fingerprint - Configuration fingerprint, as returned by
+          configuration_fingerprint() function.
+
+          entries - Dictionary mapping inputs to dictionaries with "key" and
+          "hash" keys. Default is None (no entries).
+        """
+
+        self.fingerprint = fingerprint
+        self.entries = OrderedDict() if entries is None else entries
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads manifest from passed path.
+
+        Returns:
+
+          Manifest instance, or None if the manifest does not exist.
+        """
+
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as f:
+            content = json.load(f, object_pairs_hook=OrderedDict)
+
+        return cls(content["fingerprint"], content["entries"])
+
+    def save(self, path):
+        """
+        Saves manifest to passed path. Manifest is written to a temporary file
+        first, so an interrupted save does not corrupt the existing manifest.
+        """
+
+        temporary_path = path + ".tmp"
+
+        with open(temporary_path, "w") as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": self.entries}, f, indent=0)
+
+        os.replace(temporary_path, path)
+
+
+def incremental_render(generator, inputs, sink, manifest_path, width, height, padding=(0, 0, 0, 0), output_format="png",
+                       inverted=False):
+    """
+    Renders identicons for passed inputs, taking into account the previous
+    export described by manifest. If configuration (generator and render
+    parameters) has not changed since the previous export, only identicons
+    for new inputs are rendered (each unique identicon at most once), while
+    mappings for inputs that are gone get removed. Otherwise everything is
+    rendered again. Manifest is updated once the sink has been flushed.
+
+    Inputs must be strings (since they are stored as keys of a JSON object),
+    ValueError is raised otherwise.
+
+    Arguments:
+
+      generator - Generator instance used for producing the identicons.
+
+      inputs - Iterable of hashed or raw data for which the identicons should
+      be generated.
+
+      sink - Export sink (for example, DirectorySink) that stores the
+      identicons. Sink should be the same one that was used for previous
+      export.
+
+      manifest_path - Path to manifest file.
+
+      width, height, padding, output_format, inverted - Render parameters,
+      identical to ones accepted by Generator.generate() method.
+
+    Returns:
+
+      Dictionary with the following keys:
+
+        full - Whether everything had to be rendered again.
+
+        inputs - Total number of inputs.
+
+        new - Number of new inputs.
+
+        removed - Number of removed inputs.
+
+        rendered - Number of rendered identicons.
+    """
+
+    fingerprint = configuration_fingerprint(generator, width, height, padding, output_format, inverted)
+    previous = Manifest.load(manifest_path)
+    full = previous is None or previous.fingerprint != fingerprint
+
+    previous_entries = OrderedDict() if full else previous.entries
+    manifest = Manifest(fingerprint)
+
+    # Content hashes of identicons available in the sink, keyed by identicon
+    # key.
+    hashes = dict((entry["key"], entry["hash"]) for entry in previous_entries.values())
+
+    new = 0
+    rendered = 0
+
+    for data in inputs:
+        if not isinstance(data, str):
+            raise ValueError("Incremental render supports only string inputs, got %r" % (data,))
+
+        # Duplicate inputs are exported only once.
+        if data in manifest.entries:
+            continue
+
+        entry = previous_entries.get(data)
+
+        if entry is None:
+            new += 1
+            identicon = generator.identicon(data)
+            key = identicon.key
+
+            # Sink could have been replaced since the previous export.
+            if key not in hashes or key not in sink:
+                identicon = identicon.render(width, height, padding, output_format, inverted)
+                sink.store(key, identicon)
+                rendered += 1
+
+                if not isinstance(identicon, bytes):
+                    identicon = identicon.encode("utf-8")
+                hashes[key] = hashlib.sha256(identicon).hexdigest()
+
+            entry = {"key": key, "hash": hashes[key]}
+            sink.map(data, key)
+
+        manifest.entries[data] = entry
+
+    removed = [data for data in (previous.entries if previous else ()) if data not in manifest.entries]
+    for data in removed:
+        sink.unmap(data)
+
+    sink.flush()
+    manifest.save(manifest_path)
+
+    return {"full": full, "inputs": len(manifest.entries), "new": new, "removed": len(removed), "rendered": rendered}
+
+
+def shard_ranges(path, record_size, shards):
+    """
+    Splits a digest file into byte ranges that can be processed
+    independently, for example by separate processes. Ranges are aligned to
+    record boundaries, and are as equal in size as possible.
+
+    Arguments:
+
+      path - Path to digest file.
+
+      record_size - Size of a single record in bytes.
+
+      shards - Number of ranges to split the file into.
+
+    Returns:
+
+      List of (start, stop) tuples with byte offsets of the ranges. Ranges
+      may be empty if there are more shards than records.
+    """
+
+    records = os.path.getsize(path) // record_size
+
+    return [(records * shard // shards * record_size, records * (shard + 1) // shards * record_size)
+            for shard in range(shards)]
+
+
+class DigestFile(object):
+    """
+    Reader for files consisting out of packed, fixed-width binary digest
+    records. The file is memory-mapped, and records are returned as
+    memoryview slices of the mapping - no data is copied or decoded.
+
+    Reader can be limited to a byte range of the file (see shard_ranges()
+    function), which allows multiple processes to split a single file.
+
+    Record views are valid only until the reader is closed. Closing the reader
+    while some of the views are still referenced raises BufferError - use
+    bytes() in order to keep a copy of the record.
+
+    Reader can be used as a context manager, in which case it gets closed
+    automatically.
+    """
+
+    def __init__(self, path, record_size, start=0, stop=None):
+        """
+        Initialises the reader, mapping the file into memory.
+
+        Arguments:
+
+          path - Path to digest file.
+
+          record_size - Size of a single record in bytes. Must be at least 16.
+
+          start - Byte offset of the first record to read. Must be aligned to
+          record size. Default is 0.
+
+          stop - Byte offset at which reading should stop. Must be aligned to
+          record size. Default is None (end of file).
+        """
+
+        if record_size < 16:
+            raise ValueError("Record size must be at least 16 bytes, got %d" % record_size)
+
+        size = os.path.getsize(path)
+        stop = size - size % record_size if stop is None else stop
+
+        if start % record_size or stop % record_size or not 0 <= start <= stop <= size:
+            raise ValueError("Invalid byte range %d-%d for record size %d and file size %d" % (start, stop, record_size, size))
+
+        self.record_size = record_size
+        self.start = start
+        self.stop = stop
+
+        self._mmap = None
+        self._view = memoryview(b"")
+
+        # Empty files cannot be memory-mapped.
+        if start < stop:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+
+    def __len__(self):
+        """
+        Returns number of records within the byte range of the reader.
+        """
+
+        return (self.stop - self.start) // self.record_size
+
+    def __iter__(self):
+        """
+        Iterates over (record index, record view) pairs. Record index is
+        relative to the beginning of the file.
+        """
+
+        view = self._view
+        record_size = self.record_size
+
+        for offset in range(self.start, self.stop, record_size):
+            yield offset // record_size, view[offset:offset + record_size]
+
+    def identicons(self, generator):
+        """
+        Iterates over (record index, identicon) pairs for all records within
+        the byte range of the reader.
+
+        Arguments:
+
+          generator - Generator instance used for producing the identicons.
+        """
+
+        for index, record in self:
+            yield index, generator.identicon_from_digest(record)
+
+    def close(self):
+        """
+        Closes the reader, unmapping the file.
+        """
+
+        self._view.release()
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main(arguments=None):
+    """
+    Entry point for running the module as a script.
+
+    Arguments:
+
+      arguments - List of command-line arguments. Default is to use
+      sys.argv.
+
+    Returns:
+
+      Exit code.
+    """
+
+    parser = argparse.ArgumentParser(description="Analyse collisions between identicons for data read from a file, "
+                                     "one entry per line, and optionally render the unique identicons.")
+    parser.add_argument("input_file", help="File with data, one entry per line.")
+    parser.add_argument("-r", "--rows", type=int, default=5, help="Number of block rows. Default is 5.")
+    parser.add_argument("-c", "--columns", type=int, default=5, help="Number of block columns. Default is 5.")
+    parser.add_argument("-f", "--foreground", action="append", help="Foreground colour. Can be specified multiple times. "
+                        "Default is #000000.")
+    parser.add_argument("-b", "--background", default="#ffffff", help="Background colour. Default is #ffffff.")
+    parser.add_argument("-o", "--output-directory", help="Render unique identicons into this directory.")
+    parser.add_argument("-d", "--database", help="Render unique identicons into this SQLite database.")
+    parser.add_argument("-m", "--manifest", help="Export incrementally, keeping track of exported identicons in this "
+                        "manifest file.")
+    parser.add_argument("-s", "--size", type=int, default=200, help="Width and height of identicons. Default is 200.")
+    parser.add_argument("-F", "--format", default="png", help="Output format of identicons. Default is png.")
+    args = parser.parse_args(arguments)
+
+    generator = get_generator(args.rows, args.columns, foreground=args.foreground or ["#000000"], background=args.background)
+
+    with open(args.input_file) as f:
+        inputs = [line.rstrip("\n") for line in f if line.rstrip("\n")]
+
+    if args.output_directory or args.database:
+        if args.output_directory:
+            sink = DirectorySink(args.output_directory, args.format)
+        else:
+            sink = SQLiteSink(args.database)
+
+        with sink:
+            if args.manifest:
+                statistics = incremental_render(generator, inputs, sink, args.manifest, args.size, args.size,
+                                                output_format=args.format)
+            else:
+                statistics = render_unique(generator, inputs, sink, args.size, args.size, output_format=args.format)
+    else:
+        statistics = collision_statistics(group_by_key(generator, inputs))
+
+    json.dump(statistics, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
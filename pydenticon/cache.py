@@ -0,0 +1,421 @@
+"""
+Caches for rendered identicons.
+
+Caches can be passed to Generator on initialisation, in which case generated
+identicons (including pre-compressed variants) are looked-up in the cache
+before being rendered. Only encoded results (bytes or strings) are cached.
+
+Caches are keyed by tuples that consist out of generator fingerprint,
+identicon key, and render parameters, so a single cache can be shared between
+multiple generators.
+
+Two cache implementations are available - RenderCache, which keeps rendered
+identicons in memory of a single process, and SharedMemoryCache, which keeps
+them in a shared memory block, so they can be shared by multiple processes on
+the same host (for example pre-fork web server workers).
+"""
+
+# Standard library imports.
+import hashlib
+import multiprocessing
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+# Shared memory is not available on older Python versions.
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+class RenderCache(object):
+    """
+    In-process cache of rendered identicons, bounded by number of entries.
+    Least recently used entries are evicted first. Cache is safe to use from
+    multiple threads.
+    """
+
+    def __init__(self, max_entries=10000):
+        """
+        Initialises the cache.
+
+        Arguments:
+
+          max_entries - Maximum number of entries kept in the cache. Default is
+          10000.
+        """
+
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Looks-up rendered identicon in the cache.
+
+        Arguments:
+
+          key - Cache key.
+
+        Returns:
+
+          Cached value, or None if there is no value for the key.
+        """
+
+        with self._lock:
+            value = self._entries.pop(key, None)
+
+            if value is not None:
+                self._entries[key] = value
+
+        return value
+
+    def set(self, key, value):
+        """
+        Stores rendered identicon in the cache.
+
+        Arguments:
+
+          key - Cache key.
+
+          value - Rendered identicon (bytes or string).
+        """
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedMemoryCache(object):
+    """
+    Cache of rendered identicons stored in a shared memory block, usable by
+    multiple processes at the same time.
+
+    The memory block is split into fixed-size slots. Keys are hashed, and the
+    hash determines a small window of slots in which the value can be stored.
+    Once all slots in a window are taken, the least recently written slot of
+    the window gets evicted, which keeps the cache bounded without any
+    process-wide bookkeeping. Values that do not fit into a slot are not
+    cached.
+
+    Reads do not take any locks. Every slot is guarded by a sequence counter,
+    which writers make odd for the duration of the write, and readers retry
+    (or treat as a miss) any read during which the counter changed. Writers
+    are serialised using a multiprocessing lock. Writers wait for the lock
+    only for a short time, and skip the write if they cannot obtain it, so a
+    process killed while holding the lock turns the cache read-only instead
+    of blocking all the other processes.
+
+    In case of pre-fork servers, the cache should be created in the master
+    process before forking, so that the workers inherit both the memory block
+    and the lock. Cache can also be passed as an argument to processes started
+    using the multiprocessing module (with any start method), in which case
+    they attach to the same memory block and lock. Unrelated processes cannot
+    attach to the cache, since they would not share the lock.
+    """
+
+    # Magic value identifying the memory block layout.
+    MAGIC = b"PYDCACH1"
+
+    # Block header: magic, number of slots, slot size, write counter.
+    HEADER = struct.Struct("<8sIIQ")
+
+    # Slot header: sequence counter, write stamp, key hash, value type flag,
+    # value length, value checksum.
+    SLOT_HEADER = struct.Struct("<QQ16sBII")
+
+    # Value type flags.
+    EMPTY, BYTES, STRING = 0, 1, 2
+
+    def __init__(self, name=None, slots=4096, slot_size=16384, window=8, lock=None, lock_timeout=0.1):
+        """
+        Initialises the cache, creating a new shared memory block.
+
+        Arguments:
+
+          name - Name of the shared memory block. Default is None, in which
+          case a unique name is generated.
+
+          slots - Number of slots. Default is 4096.
+
+          slot_size - Size of a single slot in bytes, including the slot
+          header. Default is 16384.
+
+          window - Number of slots in which a single key can be stored.
+          Default is 8.
+
+          lock - Lock serialising the writers. Lock must be shared with child
+          processes through inheritance, and must come from the same
+          multiprocessing context as the child processes. Default is None, in
+          which case a new lock is created using the default context.
+
+          lock_timeout - Maximum time (in seconds) writers wait for the lock
+          before giving up on the write. Default is 0.1.
+        """
+
+        if shared_memory is None:
+            raise ValueError("Shared memory is not supported on this platform.")
+
+        if slot_size <= self.SLOT_HEADER.size:
+            raise ValueError("Slot size must be larger than %d bytes." % self.SLOT_HEADER.size)
+        if slots < 1:
+            raise ValueError("Number of slots must be positive.")
+
+        self._memory = shared_memory.SharedMemory(name=name, create=True, size=self.HEADER.size + slots * slot_size)
+        self.HEADER.pack_into(self._memory.buf, 0, self.MAGIC, slots, slot_size, 0)
+
+        self._set_up(window, lock if lock is not None else multiprocessing.Lock(), lock_timeout)
+
+    def _set_up(self, window, lock, lock_timeout):
+        """
+        Reads cache layout from the memory block header, and sets-up the
+        remaining attributes.
+        """
+
+        magic, self.slots, self.slot_size, _ = self.HEADER.unpack_from(self._memory.buf, 0)
+
+        if magic != self.MAGIC:
+            self._memory.close()
+            raise ValueError("Shared memory block %s is not an identicon cache." % self._memory.name)
+
+        self.name = self._memory.name
+        self.window = min(window, self.slots)
+        self.lock = lock
+        self.lock_timeout = lock_timeout
+
+    def __getstate__(self):
+        # Pickling the lock fails unless the cache is being passed to a child
+        # process, which restricts attaching to processes sharing the lock.
+        return {"name": self.name, "window": self.window, "lock": self.lock, "lock_timeout": self.lock_timeout}
+
+    def __setstate__(self, state):
+        # Child processes must not register the block with resource tracker
+        # on their own, since it would remove the block once they exit.
+        # Before Python 3.13 registration cannot be skipped, but child
+        # processes started using multiprocessing share the resource tracker
+        # of their parent, where the block is already registered, so the
+        # registration has no effect. Unregistering it would drop the
+        # registration of the creating process as well.
+        try:
+            self._memory = shared_memory.SharedMemory(name=state["name"], track=False)
+        except TypeError:
+            self._memory = shared_memory.SharedMemory(name=state["name"])
+
+        self._set_up(state["window"], state["lock"], state["lock_timeout"])
+
+    def _hash(self, key):
+        """
+        Hashes the cache key.
+
+        Arguments:
+
+          key - Cache key, a tuple with stable representation.
+
+        Returns:
+
+          Key hash, as 16 bytes.
+        """
+
+        return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+
+    def _offsets(self, key_hash):
+        """
+        Generator that yields offsets of slots in which a key can be stored.
+
+        Arguments:
+
+          key_hash - Hash of the cache key.
+        """
+
+        start = int.from_bytes(key_hash[:8], "little") % self.slots
+
+        for i in range(self.window):
+            yield self.HEADER.size + ((start + i) % self.slots) * self.slot_size
+
+    def _read(self, offset, key_hash):
+        """
+        Reads value from a slot without taking the lock.
+
+        Arguments:
+
+          offset - Offset of the slot.
+
+          key_hash - Hash of the cache key.
+
+        Returns:
+
+          Value, or None if the slot does not hold a value for the key, or if
+          it was modified during the read.
+        """
+
+        buf = self._memory.buf
+
+        sequence, _, slot_hash, flag, length, checksum = self.SLOT_HEADER.unpack_from(buf, offset)
+
+        if sequence % 2 or flag == self.EMPTY or slot_hash != key_hash:
+            return None
+
+        start = offset + self.SLOT_HEADER.size
+        value = bytes(buf[start:start + length])
+
+        # Value is valid only if slot was not written to in the meantime.
+        if struct.unpack_from("<Q", buf, offset)[0] != sequence or zlib.crc32(value) != checksum:
+            return None
+
+        if flag == self.STRING:
+            return value.decode("utf-8")
+
+        return value
+
+    def get(self, key):
+        """
+        Looks-up rendered identicon in the cache.
+
+        Arguments:
+
+          key - Cache key.
+
+        Returns:
+
+          Cached value, or None if there is no value for the key.
+        """
+
+        key_hash = self._hash(key)
+
+        for offset in self._offsets(key_hash):
+            value = self._read(offset, key_hash)
+
+            if value is not None:
+                return value
+
+        return None
+
+    def set(self, key, value):
+        """
+        Stores rendered identicon in the cache. Values that do not fit into a
+        slot, or that cannot be stored because the lock could not be obtained
+        in time, are silently dropped.
+
+        Arguments:
+
+          key - Cache key.
+
+          value - Rendered identicon (bytes or string).
+        """
+
+        if isinstance(value, bytes):
+            flag = self.BYTES
+        else:
+            flag = self.STRING
+            value = value.encode("utf-8")
+
+        if self.SLOT_HEADER.size + len(value) > self.slot_size:
+            return
+
+        key_hash = self._hash(key)
+        buf = self._memory.buf
+
+        if not self.lock.acquire(timeout=self.lock_timeout):
+            return
+
+        try:
+            # Prefer the slot already holding the key, then an empty slot,
+            # and finally the least recently written one.
+            target, target_rank = None, None
+
+            for offset in self._offsets(key_hash):
+                _, stamp, slot_hash, slot_flag, _, _ = self.SLOT_HEADER.unpack_from(buf, offset)
+
+                if slot_flag != self.EMPTY and slot_hash == key_hash:
+                    rank = (0, 0)
+                elif slot_flag == self.EMPTY:
+                    rank = (1, 0)
+                else:
+                    rank = (2, stamp)
+
+                if target_rank is None or rank < target_rank:
+                    target, target_rank = offset, rank
+
+            magic, slots, slot_size, counter = self.HEADER.unpack_from(buf, 0)
+            counter += 1
+            self.HEADER.pack_into(buf, 0, magic, slots, slot_size, counter)
+
+            sequence = struct.unpack_from("<Q", buf, target)[0]
+
+            # Odd sequence marks the slot as being written to.
+            struct.pack_into("<Q", buf, target, sequence + 1)
+
+            start = target + self.SLOT_HEADER.size
+            buf[start:start + len(value)] = value
+            self.SLOT_HEADER.pack_into(buf, target, sequence + 1, counter, key_hash, flag, len(value), zlib.crc32(value))
+
+            struct.pack_into("<Q", buf, target, sequence + 2)
+        finally:
+            self.lock.release()
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+
+        Returns:
+
+          True if the cache was cleared, False if the lock could not be
+          obtained in time.
+        """
+
+        buf = self._memory.buf
+
+        if not self.lock.acquire(timeout=self.lock_timeout):
+            return False
+
+        try:
+            for slot in range(self.slots):
+                offset = self.HEADER.size + slot * self.slot_size
+                sequence = struct.unpack_from("<Q", buf, offset)[0]
+
+                struct.pack_into("<Q", buf, offset, sequence + 1)
+                self.SLOT_HEADER.pack_into(buf, offset, sequence + 1, 0, b"", self.EMPTY, 0, 0)
+                struct.pack_into("<Q", buf, offset, sequence + 2)
+        finally:
+            self.lock.release()
+
+        return True
+
+    def close(self):
+        """
+        Detaches the cache from the shared memory block. Memory block is not
+        removed.
+        """
+
+        self._memory.close()
+
+    def unlink(self):
+        """
+        Removes the shared memory block. Should be called only once, by the
+        process that created the cache, once no other process uses it.
+        """
+
+        self._memory.unlink()
+
+    def __len__(self):
+        buf = self._memory.buf
+
+        return sum(1 for slot in range(self.slots)
+                   if self.SLOT_HEADER.unpack_from(buf, self.HEADER.size + slot * self.slot_size)[3] != self.EMPTY)
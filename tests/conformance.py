@@ -0,0 +1,577 @@
+"""
+Conformance harness for verifying that all rendering paths (engines) produce
+results identical to the reference Generator.generate() pipeline.
+
+Every engine is run against a set of random and edge-case inputs, and the
+decoded pixels (and block matrices) are compared against the reference
+ones. Every divergence is reported together with a minimal reproducer.
+
+The harness is used by the test suite, but can also be run as a script for
+more extensive fuzzing::
+
+  python -m tests.conformance --count 5000 --seed 42
+
+New fast paths should be registered in IMAGE_ENGINES or MATRIX_ENGINES.
+"""
+
+# Standard library imports.
+import argparse
+import base64
+import binascii
+import hashlib
+import random
+import re
+import string
+import sys
+from io import BytesIO
+
+# Third-party Python library imports.
+from PIL import Image
+
+# Library imports.
+from pydenticon import CanvasPool, Generator, get_generator, splitmix64_digest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Foreground and background colours (taken from Sigil), same as used for the
+# golden samples.
+SIGIL_FOREGROUND = ["rgb(45,79,255)",
+                    "rgb(254,180,44)",
+                    "rgb(226,121,234)",
+                    "rgb(30,179,253)",
+                    "rgb(232,77,65)",
+                    "rgb(49,203,115)",
+                    "rgb(141,69,170)"]
+SIGIL_BACKGROUND = "rgb(224,224,224)"
+
+# Golden samples, with render parameters that were used for producing them.
+GOLDEN_SAMPLES = [("test1", "tests/samples/test1.png"),
+                  ("test2", "tests/samples/test2.png"),
+                  ("test3", "tests/samples/test3.png")]
+GOLDEN_PARAMETERS = {"rows": 5, "columns": 5, "width": 200, "height": 200, "padding": (20, 20, 20, 20), "inverted": False}
+
+# Block grids (rows, columns) covered by the harness. Includes odd and even
+# number of columns, and grids using maximum entropy provided by the digest
+# (120 bits of MD5 digest, excluding first byte).
+GRIDS = [(5, 5), (4, 4), (5, 6), (3, 7), (1, 1), (10, 10), (8, 30), (12, 20)]
+
+# Colour sets covered by the harness.
+COLOURS = [(["#000000"], "#ffffff"),
+           (SIGIL_FOREGROUND, SIGIL_BACKGROUND),
+           (["rgba(10,20,30,128)", "rgba(200,100,50,0)"], "rgba(224,224,224,64)")]
+
+
+class Case(object):
+    """
+    Single conformance test case - generator configuration, data, and render
+    parameters.
+    """
+
+    def __init__(self, rows, columns, foreground, background, data, width, height, padding, inverted):
+        self.rows = rows
+        self.columns = columns
+        self.foreground = foreground
+        self.background = background
+        self.data = data
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.inverted = inverted
+
+    def replace(self, **kwargs):
+        """
+        Returns copy of the case with passed attributes replaced.
+        """
+
+        attributes = dict(self.__dict__)
+        attributes.update(kwargs)
+
+        return Case(**attributes)
+
+    def generator(self):
+        """
+        Returns a reference generator for the case.
+        """
+
+        return Generator(self.rows, self.columns, foreground=self.foreground, background=self.background)
+
+    def reproducer(self):
+        """
+        Returns Python code that reproduces the case using reference pipeline.
+        """
+
+        return ("Generator(%d, %d, foreground=%r, background=%r).generate(%r, %d, %d, padding=%r, inverted=%r)" %
+                (self.rows, self.columns, self.foreground, self.background, self.data, self.width, self.height,
+                 self.padding, self.inverted))
+
+
+class Divergence(object):
+    """
+    Divergence between the reference pipeline and an engine.
+    """
+
+    def __init__(self, engine, case, description):
+        self.engine = engine
+        self.case = case
+        self.description = description
+
+    def __str__(self):
+        return "%s: %s\n  reproducer: %s" % (self.engine, self.description, self.case.reproducer())
+
+
+def decode(raw_image):
+    """
+    Decodes raw image into a Pillow image in RGBA mode.
+    """
+
+    return Image.open(BytesIO(raw_image)).convert("RGBA")
+
+
+def rasterise_svg(svg):
+    """
+    Rasterises SVG identicon into a Pillow image in RGBA mode. Only the subset
+    of SVG produced by Generator._generate_svg() is supported - the first
+    path is the background with foreground blocks cut out of it, while the
+    (optional) second path consists out of foreground blocks.
+    """
+
+    width, height = [int(value) for value in re.search(r'<svg [^>]*width="(\d+)" height="(\d+)"', svg).groups()]
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+
+    for index, (attributes, path) in enumerate(re.findall(r'<path ([^>]*)d="([^"]*)"/>', svg)):
+        fill = re.search(r'fill="#([0-9a-f]{6})"', attributes).group(1)
+        opacity = re.search(r'fill-opacity="([0-9.]+)"', attributes)
+        colour = tuple(int(fill[i:i + 2], 16) for i in (0, 2, 4)) + (int(round(float(opacity.group(1)) * 255)) if opacity else 255,)
+
+        rectangles = [[int(value) for value in rectangle]
+                      for rectangle in re.findall(r"M(\d+) (\d+)h(\d+)v(\d+)h-\d+z", path)]
+
+        for number, (x, y, rectangle_width, rectangle_height) in enumerate(rectangles):
+            # Sub-paths after the first one in background path are holes.
+            ink = (0, 0, 0, 0) if index == 0 and number > 0 else colour
+            image.paste(ink, (x, y, x + rectangle_width, y + rectangle_height))
+
+    return image
+
+
+def reference_pixels(case):
+    """
+    Renders the case using the reference pipeline, returning RGBA image.
+    """
+
+    return decode(case.generator().generate(case.data, case.width, case.height, padding=case.padding,
+                                            inverted=case.inverted))
+
+
+def reference_matrix(case):
+    """
+    Calculates block matrix for the case by checking the digest bits one by
+    one.
+    """
+
+    generator = case.generator()
+    digest_byte_list = generator._data_to_digest_byte_list(case.data)
+
+    matrix = [[False] * case.columns for _ in range(case.rows)]
+
+    for cell in range(case.rows * (case.columns // 2 + case.columns % 2)):
+        if generator._get_bit(cell, digest_byte_list[1:]):
+            matrix[cell % case.rows][cell // case.columns] = True
+            matrix[cell % case.rows][case.columns - cell // case.columns - 1] = True
+
+    return matrix
+
+
+def _render_unencoded(case, output_format):
+    """
+    Renders the case using one of the unencoded output formats.
+    """
+
+    return case.generator().generate(case.data, case.width, case.height, padding=case.padding,
+                                     output_format=output_format, inverted=case.inverted)
+
+
+def _raw_engine(case):
+    mode, size, pixels = _render_unencoded(case, "raw")
+    return Image.frombytes(mode, size, pixels)
+
+
+def _numpy_engine(case):
+    return Image.fromarray(_render_unencoded(case, "numpy"), "RGBA")
+
+
+def _identicon_engine(case):
+    return decode(case.generator().identicon(case.data).render(case.width, case.height, case.padding,
+                                                               inverted=case.inverted))
+
+
+def _svg_engine(case):
+    return rasterise_svg(case.generator().generate(case.data, case.width, case.height, padding=case.padding,
+                                                   output_format="svg", inverted=case.inverted))
+
+
+def _data_uri_engine(case):
+    data_uri = case.generator().identicon(case.data).render(case.width, case.height, case.padding,
+                                                            output_format="data-uri:png", inverted=case.inverted)
+    return decode(base64.b64decode(data_uri[len("data:image/png;base64,"):]))
+
+
+def _digest_engine(case):
+    generator = case.generator()
+    digest = memoryview(bytearray(generator._data_to_digest_byte_list(case.data)))
+    return decode(generator.identicon_from_digest(digest).render(case.width, case.height, case.padding,
+                                                                 inverted=case.inverted))
+
+
+def _stream_engine(case):
+    stream = BytesIO()
+    case.generator().stream(case.data, stream, case.width, case.height, padding=case.padding, inverted=case.inverted)
+    return decode(stream.getvalue())
+
+
+_canvas_pool = CanvasPool()
+
+
+def _canvas_pool_engine(case):
+    generator = Generator(case.rows, case.columns, foreground=case.foreground, background=case.background,
+                          canvas_pool=_canvas_pool)
+    return decode(generator.generate(case.data, case.width, case.height, padding=case.padding, inverted=case.inverted))
+
+
+def _shared_generator_engine(case):
+    generator = get_generator(case.rows, case.columns, foreground=case.foreground, background=case.background)
+    return decode(generator.generate(case.data, case.width, case.height, padding=case.padding, inverted=case.inverted))
+
+
+# Engines producing images. Each engine accepts a case, and returns RGBA
+# Pillow image.
+IMAGE_ENGINES = {
+    "image": lambda case: _render_unencoded(case, "image"),
+    "raw": _raw_engine,
+    "identicon": _identicon_engine,
+    "digest": _digest_engine,
+    "svg": _svg_engine,
+    "data-uri": _data_uri_engine,
+    "canvas-pool": _canvas_pool_engine,
+    "shared-generator": _shared_generator_engine,
+    "stream": _stream_engine,
+    }
+
+if numpy is not None:
+    IMAGE_ENGINES["numpy"] = _numpy_engine
+
+# Engines producing block matrices. Each engine accepts a case, and returns
+# block matrix.
+MATRIX_ENGINES = {
+    "cell-layout": lambda case: case.generator()._generate_matrix(case.generator()._data_to_digest_byte_list(case.data)),
+    "identicon": lambda case: case.generator().identicon(case.data).matrix,
+    }
+
+
+def _random_text(rng, alphabet, length):
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def generate_data(rng):
+    """
+    Generates a single piece of (random or edge-case) data.
+    """
+
+    kind = rng.randrange(8)
+
+    if kind == 0:
+        # Valid hex digest.
+        return hashlib.md5(_random_text(rng, string.ascii_letters, 10).encode("utf-8")).hexdigest()
+    elif kind == 1:
+        # Hex digest lookalike (same length, but not valid hex).
+        return _random_text(rng, string.ascii_lowercase, 32)
+    elif kind == 2:
+        # Hex digest lookalike with upper-case hex characters, and nearly-hex.
+        return rng.choice([_random_text(rng, "0123456789ABCDEF", 32), _random_text(rng, "0123456789abcdef", 31) + "g"])
+    elif kind == 3:
+        # Maximum and minimum entropy digests.
+        return rng.choice(["f" * 32, "0" * 32, "0f" * 16, "f0" * 16])
+    elif kind == 4:
+        # Non-ASCII data.
+        return u"željko" + _random_text(rng, u"šđčćabc", rng.randrange(10))
+    elif kind == 5:
+        return rng.choice(["", " ", "\n", "test1"])
+    elif kind == 6:
+        # Integer IDs (hashed through their string representation).
+        return rng.choice([0, -1, 2 ** 64 - 1, rng.randrange(-2 ** 63, 2 ** 64)])
+
+    return _random_text(rng, string.printable, rng.randrange(1, 64))
+
+
+def generate_cases(seed, count):
+    """
+    Generates random and edge-case conformance test cases.
+
+    Arguments:
+
+      seed - Seed for random number generator.
+
+      count - Number of cases to generate.
+
+    Returns:
+
+      List of Case instances.
+    """
+
+    rng = random.Random(seed)
+    cases = []
+
+    for _ in range(count):
+        rows, columns = rng.choice(GRIDS)
+        foreground, background = rng.choice(COLOURS)
+
+        # Mix sizes that are (and are not) divisible by number of blocks. Blocks
+        # must be at least one pixel in size.
+        width = rng.choice([columns * rng.randrange(1, 8), rng.randrange(columns, columns + 120)])
+        height = rng.choice([rows * rng.randrange(1, 8), rng.randrange(rows, rows + 120)])
+        padding = rng.choice([(0, 0, 0, 0), (20, 20, 20, 20), tuple(rng.randrange(0, 9) for _ in range(4))])
+
+        cases.append(Case(rows, columns, foreground, background, generate_data(rng), width, height, padding,
+                          rng.choice([False, True])))
+
+    return cases
+
+
+def _image_divergence(engine, case):
+    """
+    Compares image engine result against reference for a case.
+
+    Returns:
+
+      Description of divergence, or None if results are identical.
+    """
+
+    expected = reference_pixels(case)
+    actual = engine(case).convert("RGBA")
+
+    if actual.size != expected.size:
+        return "size %r differs from reference size %r" % (actual.size, expected.size)
+
+    if actual.tobytes() != expected.tobytes():
+        return "pixels differ from reference"
+
+    return None
+
+
+def _matrix_divergence(engine, case):
+    """
+    Compares matrix engine result against reference for a case.
+
+    Returns:
+
+      Description of divergence, or None if results are identical.
+    """
+
+    expected = reference_matrix(case)
+    actual = [[bool(cell) for cell in row] for row in engine(case)]
+
+    if actual != expected:
+        return "matrix %r differs from reference matrix %r" % (actual, expected)
+
+    return None
+
+
+def minimise(check, case):
+    """
+    Simplifies a diverging case, as long as it keeps diverging.
+
+    Arguments:
+
+      check - Function that accepts a case, and returns divergence description
+      (or None).
+
+      case - Diverging case.
+
+    Returns:
+
+      Tuple consisting out of simplified case and its divergence description.
+    """
+
+    description = check(case)
+
+    simplified = True
+    while simplified:
+        simplified = False
+
+        candidates = [case.replace(padding=(0, 0, 0, 0)),
+                      case.replace(inverted=False),
+                      case.replace(foreground=case.foreground[:1]),
+                      case.replace(width=case.columns, height=case.rows),
+                      case.replace(width=max(case.columns, case.width // 2)),
+                      case.replace(height=max(case.rows, case.height // 2)),
+                      case.replace(data=case.data // 2 if isinstance(case.data, int) else case.data[:len(case.data) // 2])]
+
+        for candidate in candidates:
+            if candidate.__dict__ == case.__dict__:
+                continue
+
+            try:
+                candidate_description = check(candidate)
+            except Exception as e:
+                candidate_description = "raised %r" % e
+
+            if candidate_description is not None:
+                case, description = candidate, candidate_description
+                simplified = True
+                break
+
+    return case, description
+
+
+def run(cases, image_engines=None, matrix_engines=None):
+    """
+    Runs the passed cases through engines, and compares results against the
+    reference pipeline.
+
+    Arguments:
+
+      cases - List of Case instances.
+
+      image_engines - Dictionary of image engines to check. Default is
+      IMAGE_ENGINES.
+
+      matrix_engines - Dictionary of matrix engines to check. Default is
+      MATRIX_ENGINES.
+
+    Returns:
+
+      List of Divergence instances, at most one per engine (for the first
+      diverging case, minimised).
+    """
+
+    image_engines = IMAGE_ENGINES if image_engines is None else image_engines
+    matrix_engines = MATRIX_ENGINES if matrix_engines is None else matrix_engines
+
+    checks = [(name, lambda case, engine=engine: _image_divergence(engine, case)) for name, engine in sorted(image_engines.items())]
+    checks += [("matrix/" + name, lambda case, engine=engine: _matrix_divergence(engine, case))
+               for name, engine in sorted(matrix_engines.items())]
+
+    divergences = []
+
+    for name, check in checks:
+        for case in cases:
+            try:
+                description = check(case)
+            except Exception as e:
+                description = "raised %r" % e
+
+            if description is not None:
+                case, description = minimise(check, case)
+                divergences.append(Divergence(name, case, description))
+                break
+
+    return divergences
+
+
+def golden_divergences(image_engines=None):
+    """
+    Compares results of all image engines against golden samples.
+
+    Arguments:
+
+      image_engines - Dictionary of image engines to check. Default is
+      IMAGE_ENGINES. Reference pipeline is always checked as well.
+
+    Returns:
+
+      List of Divergence instances.
+    """
+
+    image_engines = dict(IMAGE_ENGINES if image_engines is None else image_engines)
+    image_engines["reference"] = reference_pixels
+
+    divergences = []
+
+    for data, path in GOLDEN_SAMPLES:
+        case = Case(GOLDEN_PARAMETERS["rows"], GOLDEN_PARAMETERS["columns"], SIGIL_FOREGROUND, SIGIL_BACKGROUND, data,
+                    GOLDEN_PARAMETERS["width"], GOLDEN_PARAMETERS["height"], GOLDEN_PARAMETERS["padding"],
+                    GOLDEN_PARAMETERS["inverted"])
+        expected = Image.open(path).convert("RGBA")
+
+        for name, engine in sorted(image_engines.items()):
+            if engine(case).convert("RGBA").tobytes() != expected.tobytes():
+                divergences.append(Divergence(name, case, "pixels differ from golden sample %s" % path))
+
+    return divergences
+
+
+def integer_divergences(seed, count):
+    """
+    Compares vectorised integer hashing (used by
+    Generator.identicons_from_integers() method) against the pure Python
+    SplitMix64 implementation, for random and edge-case integers. Requires
+    NumPy - without it, the vectorised path is not used at all.
+
+    Arguments:
+
+      seed - Seed for random number generator.
+
+      count - Number of random integers.
+
+    Returns:
+
+      List of strings describing the divergences.
+    """
+
+    if numpy is None:
+        return []
+
+    rng = random.Random(seed)
+    values = [0, 1, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 63, 2 ** 64 - 1]
+    values += [rng.randrange(-2 ** 63, 2 ** 64) for _ in range(count)]
+
+    generator = Generator(5, 5, integer_hash="splitmix64")
+    divergences = []
+
+    # Python integers, as well as signed and unsigned NumPy arrays.
+    batches = [("list", values, values),
+               ("int64", numpy.array([value for value in values if value < 2 ** 63], dtype=numpy.int64), None),
+               ("uint64", numpy.array([value for value in values if value >= 0], dtype=numpy.uint64), None)]
+
+    for name, batch, expected_values in batches:
+        expected_values = [int(value) for value in batch] if expected_values is None else expected_values
+
+        for value, identicon in zip(expected_values, generator.identicons_from_integers(batch)):
+            expected = bytes(bytearray(splitmix64_digest(value)))
+            actual = bytes(identicon.digest_byte_list)
+
+            if actual != expected or identicon.key != generator.identicon(value).key:
+                divergences.append("%s: digest %s of integer %d differs from reference digest %s\n"
+                                   "  reproducer: Generator(5, 5, integer_hash=\"splitmix64\").identicons_from_integers(%r)" %
+                                   (name, binascii.hexlify(actual), value, binascii.hexlify(expected), [value]))
+
+    return divergences
+
+
+def main(arguments=None):
+    """
+    Entry point for running the harness as a script.
+    """
+
+    parser = argparse.ArgumentParser(description="Verify that all rendering paths match the reference pipeline.")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="Number of random cases. Default is 1000.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed for random number generator. Default is 0.")
+    args = parser.parse_args(arguments)
+
+    divergences = golden_divergences() + run(generate_cases(args.seed, args.count))
+    divergences += integer_divergences(args.seed, args.count)
+
+    for divergence in divergences:
+        print(divergence)
+
+    print("%d divergences found" % len(divergences))
+
+    return 1 if divergences else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
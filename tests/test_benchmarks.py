@@ -0,0 +1,115 @@
+# Standard library imports.
+import unittest
+
+# Third-party Python library imports.
+import mock
+
+# Library imports.
+from benchmarks import load, memory
+from pydenticon import Generator
+
+
+class MemoryProfilingTest(unittest.TestCase):
+    """
+    Implements tests for benchmarks.memory module.
+    """
+
+    def test_profile_stages(self):
+        """
+        Tests if all stages get profiled.
+        """
+
+        generator = Generator(5, 5)
+
+        results = memory.profile_stages(generator, ["test1", "test2"], 100, 100, output_format="png")
+        self.assertEqual(sorted(results.keys()), ["canvas", "digest", "encode", "matrix", "render"])
+        self.assertEqual(results["canvas"]["image_bytes"], 100 * 100 * 4)
+        self.assertEqual(results["encode"]["image_bytes"], 0)
+        self.assertGreater(results["encode"]["peak"], 0)
+        self.assertGreaterEqual(results["render"]["peak"], results["encode"]["peak"])
+
+        results = memory.profile_stages(generator, ["test1", "test2"], 100, 100, padding=(10, 0, 10, 0), output_format="jpeg")
+        self.assertEqual(results["encode"]["image_bytes"], 110 * 110 * 4)
+        self.assertEqual(results["render"]["image_bytes"], 2 * 110 * 110 * 4)
+
+    def test_profile_render_path(self):
+        """
+        Tests if allocations made by the real render path are measured.
+        """
+
+        generator = Generator(5, 5)
+        generate_image = generator._generate_image
+
+        def wasteful_generate_image(*args):
+            waste = bytearray(5 * 1024 * 1024)
+            del waste
+            return generate_image(*args)
+
+        with mock.patch.object(generator, "_generate_image", side_effect=wasteful_generate_image):
+            results = memory.profile_stages(generator, ["test1", "test2"], 200, 200, (20, 20, 20, 20), "png")
+
+        self.assertGreater(results["render"]["peak"], 5 * 1024 * 1024)
+        self.assertNotEqual(memory.check_budgets({"png": results}, memory.load_budgets()), [])
+
+    def test_check_budgets(self):
+        """
+        Tests if measurements exceeding the budgets are reported.
+        """
+
+        results = {"png": {"digest": {"blocks": 5.0, "peak": 100}, "matrix": {"blocks": 20.0, "peak": 100}}}
+        budgets = {"png": {"digest": {"blocks": 5, "peak": 200}, "matrix": {"blocks": 10, "peak": 200}}}
+
+        self.assertEqual(memory.check_budgets(results, budgets), ["png/matrix/blocks: 20.0 exceeds budget of 10"])
+
+    def test_budgets(self):
+        """
+        Tests if memory usage of generate() stages is within checked-in
+        budgets.
+        """
+
+        generator = Generator(5, 5, foreground=["#000000", "#ff0000", "#00ff00", "#0000ff"])
+        inputs = ["user%d@example.com" % i for i in range(20)]
+
+        results = dict((output_format, memory.profile_stages(generator, inputs, 200, 200, (20, 20, 20, 20), output_format))
+                       for output_format in ["png", "jpeg"])
+
+        self.assertEqual(memory.check_budgets(results, memory.load_budgets()), [])
+
+
+class LoadTest(unittest.TestCase):
+    """
+    Implements tests for benchmarks.load module.
+    """
+
+    def test_percentile(self):
+        """
+        Tests calculation of percentiles.
+        """
+
+        values = list(range(1, 101))
+
+        self.assertEqual(load.percentile(values, 50), 50)
+        self.assertEqual(load.percentile(values, 99), 99)
+        self.assertEqual(load.percentile(values, 100), 100)
+        self.assertEqual(load.percentile([5], 99), 5)
+        self.assertEqual(load.percentile([], 50), None)
+
+    def test_scaling(self):
+        """
+        Tests if scaling benchmark reports results for every number of
+        workers, in both modes.
+        """
+
+        for mode in ["thread", "process"]:
+            results = load.scaling(mode, 2, 20, 50, 50, output_format="png")
+
+            self.assertEqual([result["workers"] for result in results], [1, 2])
+            self.assertEqual(results[0]["efficiency"], 1.0)
+
+            for result in results:
+                self.assertGreater(result["throughput"], 0)
+                self.assertLessEqual(result["p50"], result["p99"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,721 @@
+# Standard library imports.
+import binascii
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+# Third-party Python library imports.
+import mock
+
+# Library imports.
+from pydenticon import Generator
+from pydenticon.bulk import (DigestFile, DirectorySink, Manifest, SQLiteReader, SQLiteSink, collision_statistics,
+                             configuration_fingerprint, group_by_key, group_digests_by_key, incremental_render, main,
+                             render_unique, render_unique_digests, shard_ranges)
+
+
+class BulkTest(unittest.TestCase):
+    """
+    Implements tests for pydenticon.bulk module.
+    """
+
+    def setUp(self):
+        """
+        Sets-up a generator producing lots of collisions (only two colours, and
+        2x2 blocks, meaning 2 * 2**2 possible identicons), and a temporary
+        directory.
+        """
+
+        self.generator = Generator(2, 2, foreground=["#000000", "#ff0000"])
+        self.inputs = ["user%d" % i for i in range(100)]
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+
+        shutil.rmtree(self.directory)
+
+    def test_group_by_key(self):
+        """
+        Tests if inputs are grouped by identicon key.
+        """
+
+        groups = group_by_key(self.generator, self.inputs)
+
+        self.assertEqual(sum(len(group) for group in groups.values()), 100)
+        self.assertLessEqual(len(groups), 8)
+
+        for key, group in groups.items():
+            for data in group:
+                self.assertEqual(self.generator.identicon(data).key, key)
+
+        # Groups should be ordered by first appearance.
+        self.assertEqual(list(groups.values())[0][0], "user0")
+
+    @mock.patch.object(Generator, "_generate_image")
+    def test_group_by_key_no_render(self, generate_image_mock):
+        """
+        Tests if grouping does not render anything.
+        """
+
+        group_by_key(self.generator, self.inputs)
+
+        self.assertEqual(generate_image_mock.call_count, 0)
+
+    def test_collision_statistics(self):
+        """
+        Tests calculation of collision statistics.
+        """
+
+        groups = {"a": ["1", "2", "3"], "b": ["4"], "c": ["5", "6"]}
+
+        statistics = collision_statistics(groups)
+
+        self.assertEqual(statistics, {"inputs": 6, "unique": 3, "colliding_inputs": 5, "largest_group": 3, "reduction": 2.0})
+
+    def test_collision_statistics_empty(self):
+        """
+        Tests calculation of collision statistics for no inputs.
+        """
+
+        statistics = collision_statistics({})
+
+        self.assertEqual(statistics, {"inputs": 0, "unique": 0, "colliding_inputs": 0, "largest_group": 0, "reduction": 1.0})
+
+    def test_render_unique(self):
+        """
+        Tests if every unique identicon is rendered once, and if mapping points
+        to correct identicon for every input.
+        """
+
+        with mock.patch.object(Generator, "_generate_image", wraps=self.generator._generate_image) as generate_image_mock:
+            with DirectorySink(self.directory, "png") as sink:
+                statistics = render_unique(self.generator, self.inputs, sink, 20, 20, padding=(1, 1, 1, 1))
+
+        self.assertEqual(generate_image_mock.call_count, statistics["unique"])
+        self.assertEqual(statistics["inputs"], 100)
+
+        with open(os.path.join(self.directory, "mapping.json")) as f:
+            mapping = json.load(f)
+
+        self.assertEqual(sorted(mapping.keys()), sorted(self.inputs))
+        self.assertEqual(len(os.listdir(self.directory)), statistics["unique"] + 1)
+
+        for data in ["user0", "user42", "user99"]:
+            with open(os.path.join(self.directory, mapping[data]), "rb") as f:
+                self.assertEqual(f.read(), self.generator.generate(data, 20, 20, padding=(1, 1, 1, 1)))
+
+    def test_render_unique_existing(self):
+        """
+        Tests if identicons already present in the sink are not rendered
+        again.
+        """
+
+        with DirectorySink(self.directory, "png") as sink:
+            render_unique(self.generator, self.inputs[:50], sink, 20, 20)
+
+        with mock.patch.object(Generator, "_generate_image") as generate_image_mock:
+            with DirectorySink(self.directory, "png") as sink:
+                render_unique(self.generator, self.inputs[:50], sink, 20, 20)
+
+        self.assertEqual(generate_image_mock.call_count, 0)
+
+    def test_render_unique_ascii(self):
+        """
+        Tests if ASCII identicons are stored as text.
+        """
+
+        with DirectorySink(self.directory, "txt") as sink:
+            render_unique(self.generator, ["user0"], sink, 20, 20, output_format="ascii")
+
+        with open(os.path.join(self.directory, sink.mapping["user0"])) as f:
+            self.assertEqual(f.read(), self.generator.generate("user0", 20, 20, output_format="ascii"))
+
+    def test_directory_sink_existing_mapping(self):
+        """
+        Tests if directory sink keeps mappings from previous exports.
+        """
+
+        with DirectorySink(self.directory, "png") as sink:
+            render_unique(self.generator, ["user0", "user1"], sink, 20, 20)
+
+        with DirectorySink(self.directory, "png") as sink:
+            render_unique(self.generator, ["user2"], sink, 20, 20)
+            sink.unmap("user1")
+
+        with open(os.path.join(self.directory, "mapping.json")) as f:
+            self.assertEqual(sorted(json.load(f).keys()), ["user0", "user2"])
+
+    def test_main(self):
+        """
+        Tests running the bulk tool as a script.
+        """
+
+        input_file = os.path.join(self.directory, "inputs.txt")
+        output_directory = os.path.join(self.directory, "output")
+
+        with open(input_file, "w") as f:
+            f.write("\n".join(self.inputs) + "\n")
+
+        with mock.patch("sys.stdout") as stdout_mock:
+            self.assertEqual(main([input_file, "-r", "2", "-c", "2", "-o", output_directory, "-s", "10"]), 0)
+
+        statistics = json.loads("".join(call[0][0] for call in stdout_mock.write.call_args_list))
+
+        self.assertEqual(statistics["inputs"], 100)
+        self.assertEqual(len(os.listdir(output_directory)), statistics["unique"] + 1)
+
+    def test_main_incremental(self):
+        """
+        Tests running incremental export as a script.
+        """
+
+        input_file = os.path.join(self.directory, "inputs.txt")
+        database = os.path.join(self.directory, "identicons.sqlite")
+        manifest = os.path.join(self.directory, "manifest.json")
+
+        with open(input_file, "w") as f:
+            f.write("\n".join(self.inputs) + "\n")
+
+        for expected_new in [100, 0]:
+            with mock.patch("sys.stdout") as stdout_mock:
+                self.assertEqual(main([input_file, "-d", database, "-m", manifest, "-s", "10"]), 0)
+
+            statistics = json.loads("".join(call[0][0] for call in stdout_mock.write.call_args_list))
+            self.assertEqual(statistics["new"], expected_new)
+
+
+class SQLiteTest(unittest.TestCase):
+    """
+    Implements tests for exporting identicons into SQLite database.
+    """
+
+    def setUp(self):
+        """
+        Sets-up a generator producing lots of collisions, and a temporary
+        directory.
+        """
+
+        self.generator = Generator(2, 2, foreground=["#000000", "#ff0000"])
+        self.inputs = ["user%d" % i for i in range(100)]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "identicons.sqlite")
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+
+        shutil.rmtree(self.directory)
+
+    def test_render_unique(self):
+        """
+        Tests if unique identicons are stored once, and served for every input.
+        """
+
+        with SQLiteSink(self.path, batch_size=7) as sink:
+            statistics = render_unique(self.generator, self.inputs, sink, 20, 20)
+
+        with SQLiteReader(self.path) as reader:
+            for data in self.inputs:
+                self.assertEqual(reader.read(data), self.generator.generate(data, 20, 20))
+
+            key = self.generator.identicon("user0").key
+            self.assertEqual(reader.read(key=key), self.generator.generate("user0", 20, 20))
+
+            self.assertEqual(reader._connection.execute("SELECT COUNT(*) FROM identicons").fetchone()[0], statistics["unique"])
+            self.assertEqual(reader._connection.execute("SELECT COUNT(*) FROM inputs").fetchone()[0], 100)
+            self.assertEqual(reader._connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_batching(self):
+        """
+        Tests if writes are committed in batches, and on close.
+        """
+
+        sink = SQLiteSink(self.path, batch_size=3)
+
+        sink.store("aa", b"first")
+        sink.map("user0", "aa")
+        self.assertIn("aa", sink)
+
+        with SQLiteReader(self.path) as reader:
+            self.assertRaises(KeyError, reader.read, "user0")
+
+        sink.map("user1", "aa")
+
+        with SQLiteReader(self.path) as reader:
+            self.assertEqual(reader.read("user1"), b"first")
+
+        sink.store("bb", u"text")
+        sink.map("user2", "bb")
+        sink.close()
+
+        with SQLiteReader(self.path) as reader:
+            self.assertEqual(reader.read("user2"), b"text")
+            self.assertEqual(reader.read(key="bb"), b"text")
+
+    def test_map_missing(self):
+        """
+        Tests if mapping inputs to identicons that were never stored is
+        reported, without writing out the batch.
+        """
+
+        sink = SQLiteSink(self.path)
+
+        sink.store("aa", b"first")
+        sink.map("user0", "aa")
+        sink.flush()
+
+        # Replacing an existing mapping must not be reported.
+        sink.map("user0", "aa")
+        sink.map("user1", "aa")
+        sink.flush()
+
+        sink.map("user2", "aa")
+        sink.map("user3", "missing")
+
+        self.assertRaises(ValueError, sink.flush)
+
+        with SQLiteReader(self.path) as reader:
+            self.assertRaises(KeyError, reader.read, "user2")
+
+        sink.store("missing", b"second")
+        sink.close()
+
+        with SQLiteReader(self.path) as reader:
+            self.assertEqual(reader.read("user2"), b"first")
+            self.assertEqual(reader.read("user3"), b"second")
+
+    def test_batching_unmap(self):
+        """
+        Tests if removals of mappings are committed in batches.
+        """
+
+        with SQLiteSink(self.path) as sink:
+            sink.store("aa", b"first")
+            for data in ["user0", "user1", "user2"]:
+                sink.map(data, "aa")
+
+        sink = SQLiteSink(self.path, batch_size=4)
+
+        sink.unmap("user0")
+        sink.unmap("user1")
+
+        with SQLiteReader(self.path) as reader:
+            self.assertEqual(reader.read("user0"), b"first")
+
+        # Mapping again cancels pending removal.
+        sink.unmap("user2")
+        sink.map("user2", "aa")
+        sink.unmap("missing")
+
+        with SQLiteReader(self.path) as reader:
+            self.assertRaises(KeyError, reader.read, "user0")
+            self.assertRaises(KeyError, reader.read, "user1")
+            self.assertEqual(reader.read("user2"), b"first")
+
+        sink.close()
+
+    def test_existing(self):
+        """
+        Tests if identicons already present in the database are not rendered
+        again.
+        """
+
+        with SQLiteSink(self.path) as sink:
+            render_unique(self.generator, self.inputs[:50], sink, 20, 20)
+
+        with mock.patch.object(Generator, "_generate_image") as generate_image_mock:
+            with SQLiteSink(self.path) as sink:
+                render_unique(self.generator, self.inputs, sink, 20, 20)
+
+        self.assertLess(generate_image_mock.call_count, 8)
+
+        with SQLiteReader(self.path) as reader:
+            self.assertEqual(reader.read("user10"), self.generator.generate("user10", 20, 20))
+
+    def test_open(self):
+        """
+        Tests if identicons can be read incrementally.
+        """
+
+        with SQLiteSink(self.path) as sink:
+            sink.store("aa", b"0123456789")
+            sink.map("user0", "aa")
+
+        with SQLiteReader(self.path) as reader:
+            blob = reader.open("user0")
+            self.assertEqual(blob.read(4), b"0123")
+            self.assertEqual(blob.read(), b"456789")
+            blob.close()
+
+            self.assertRaises(KeyError, reader.open, "missing")
+            self.assertRaises(KeyError, reader.open, key="missing")
+
+    def test_missing_database(self):
+        """
+        Tests if an error is raised when opening missing database.
+        """
+
+        self.assertRaises(IOError, SQLiteReader, self.path)
+
+
+class IncrementalRenderTest(unittest.TestCase):
+    """
+    Implements tests for manifest-based incremental exports.
+    """
+
+    def setUp(self):
+        """
+        Sets-up a generator, and a temporary directory.
+        """
+
+        self.generator = Generator(5, 5, foreground=["#000000", "#ff0000"])
+        self.inputs = ["user%d" % i for i in range(20)]
+        self.directory = tempfile.mkdtemp()
+        self.output_directory = os.path.join(self.directory, "output")
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+
+        shutil.rmtree(self.directory)
+
+    def _render(self, inputs, generator=None, width=20):
+        """
+        Helper for running incremental export into the output directory.
+        """
+
+        with DirectorySink(self.output_directory, "png") as sink:
+            return incremental_render(generator or self.generator, inputs, sink, self.manifest_path, width, width)
+
+    def test_configuration_fingerprint(self):
+        """
+        Tests if fingerprint changes with every configuration change.
+        """
+
+        fingerprint = configuration_fingerprint(self.generator, 20, 20)
+
+        self.assertEqual(configuration_fingerprint(Generator(5, 5, foreground=["black", "red"]), 20, 20), fingerprint)
+
+        self.assertNotEqual(configuration_fingerprint(Generator(5, 6, foreground=["#000000", "#ff0000"]), 20, 20), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(Generator(5, 5, foreground=["#000000"]), 20, 20), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(Generator(5, 5, foreground=["#000000", "#ff0000"], background="#000000"),
+                                                      20, 20), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(Generator(5, 5, digest=hashlib.sha1, foreground=["#000000", "#ff0000"]),
+                                                      20, 20), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(self.generator, 20, 21), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(self.generator, 20, 20, padding=(1, 0, 0, 0)), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(self.generator, 20, 20, output_format="gif"), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(self.generator, 20, 20, inverted=True), fingerprint)
+        self.assertNotEqual(configuration_fingerprint(Generator(5, 5, foreground=["#000000", "#ff0000"], integer_hash="splitmix64"),
+                                                      20, 20), fingerprint)
+
+    def test_manifest(self):
+        """
+        Tests saving and loading of manifest.
+        """
+
+        self.assertIsNone(Manifest.load(self.manifest_path))
+
+        manifest = Manifest("abcd")
+        manifest.entries["user0"] = {"key": "01ff", "hash": "1234"}
+        manifest.save(self.manifest_path)
+
+        manifest = Manifest.load(self.manifest_path)
+        self.assertEqual(manifest.fingerprint, "abcd")
+        self.assertEqual(manifest.entries, {"user0": {"key": "01ff", "hash": "1234"}})
+
+    def test_incremental_render(self):
+        """
+        Tests if only new inputs get rendered when configuration has not
+        changed.
+        """
+
+        statistics = self._render(self.inputs[:10])
+        self.assertEqual(statistics, {"full": True, "inputs": 10, "new": 10, "removed": 0, "rendered": 10})
+
+        # Nothing should be calculated for unchanged inputs.
+        with mock.patch.object(Generator, "_data_to_digest_byte_list") as digest_mock:
+            statistics = self._render(self.inputs[:10])
+
+        self.assertEqual(digest_mock.call_count, 0)
+        self.assertEqual(statistics, {"full": False, "inputs": 10, "new": 0, "removed": 0, "rendered": 0})
+
+        # Only new inputs should be rendered, while removed ones are unmapped.
+        statistics = self._render(self.inputs[5:])
+        self.assertEqual(statistics, {"full": False, "inputs": 15, "new": 10, "removed": 5, "rendered": 10})
+
+        with open(os.path.join(self.output_directory, "mapping.json")) as f:
+            mapping = json.load(f)
+
+        self.assertEqual(sorted(mapping.keys()), sorted(self.inputs[5:]))
+
+        manifest = Manifest.load(self.manifest_path)
+        for data in self.inputs[5:]:
+            with open(os.path.join(self.output_directory, mapping[data]), "rb") as f:
+                identicon = f.read()
+
+            self.assertEqual(identicon, self.generator.generate(data, 20, 20))
+            self.assertEqual(manifest.entries[data]["hash"], hashlib.sha256(identicon).hexdigest())
+
+    def test_incremental_render_collisions(self):
+        """
+        Tests if new inputs sharing identicon with existing ones are not
+        rendered.
+        """
+
+        generator = Generator(2, 2, foreground=["#000000", "#ff0000"])
+        inputs = ["user%d" % i for i in range(100)]
+
+        first = self._render(inputs[:50], generator)
+        second = self._render(inputs, generator)
+
+        self.assertEqual(second["new"], 50)
+        self.assertEqual(first["rendered"] + second["rendered"], len(group_by_key(generator, inputs)))
+
+    def test_incremental_render_configuration_change(self):
+        """
+        Tests if everything is rendered again when configuration changes.
+        """
+
+        self._render(self.inputs[:10])
+
+        statistics = self._render(self.inputs[:8], width=40)
+        self.assertEqual(statistics, {"full": True, "inputs": 8, "new": 8, "removed": 2, "rendered": 8})
+
+        with open(os.path.join(self.output_directory, "mapping.json")) as f:
+            mapping = json.load(f)
+
+        with open(os.path.join(self.output_directory, mapping["user0"]), "rb") as f:
+            self.assertEqual(f.read(), self.generator.generate("user0", 40, 40))
+
+    def test_incremental_render_replaced_sink(self):
+        """
+        Tests if identicons missing from a replaced sink are rendered again
+        for new inputs.
+        """
+
+        first = os.path.join(self.directory, "first.sqlite")
+        second = os.path.join(self.directory, "second.sqlite")
+
+        # Inputs sharing the same identicon.
+        generator = Generator(1, 1)
+        inputs = [data for data in self.inputs if generator.identicon(data).key == generator.identicon("user0").key]
+        self.assertGreater(len(inputs), 1)
+
+        with SQLiteSink(first) as sink:
+            incremental_render(generator, inputs[:1], sink, self.manifest_path, 20, 20)
+
+        with SQLiteSink(second) as sink:
+            statistics = incremental_render(generator, inputs[:2], sink, self.manifest_path, 20, 20)
+
+        self.assertEqual(statistics["rendered"], 1)
+
+        with SQLiteReader(second) as reader:
+            self.assertEqual(reader.read(inputs[1]), generator.generate(inputs[1], 20, 20))
+
+    def test_incremental_render_sqlite(self):
+        """
+        Tests incremental export into SQLite database.
+        """
+
+        path = os.path.join(self.directory, "identicons.sqlite")
+
+        for inputs in [self.inputs[:10], self.inputs[5:]]:
+            with SQLiteSink(path) as sink:
+                incremental_render(self.generator, inputs, sink, self.manifest_path, 20, 20)
+
+        with SQLiteReader(path) as reader:
+            self.assertRaises(KeyError, reader.read, "user0")
+            self.assertEqual(reader.read("user19"), self.generator.generate("user19", 20, 20))
+
+
+    def test_incremental_render_duplicates(self):
+        """
+        Tests if duplicate inputs are counted as new only once.
+        """
+
+        statistics = self._render(["user0", "user1", "user0", "user0"])
+        self.assertEqual(statistics, {"full": True, "inputs": 2, "new": 2, "removed": 0, "rendered": 2})
+
+        statistics = self._render(["user0", "user2", "user2"])
+        self.assertEqual(statistics, {"full": False, "inputs": 2, "new": 1, "removed": 1, "rendered": 1})
+
+    def test_incremental_render_invalid_input(self):
+        """
+        Tests if non-string inputs are rejected.
+        """
+
+        self.assertRaises(ValueError, self._render, ["user0", 42])
+
+class DigestFileTest(unittest.TestCase):
+    """
+    Implements tests for reading fixed-width binary digest files.
+    """
+
+    def setUp(self):
+        """
+        Sets-up a temporary directory with a digest file consisting out of SHA1
+        digests (20-byte records).
+        """
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "digests.bin")
+        self.inputs = ["user%d" % i for i in range(10)]
+        self.digests = [hashlib.sha1(data.encode("utf-8")).digest() for data in self.inputs]
+
+        with open(self.path, "wb") as f:
+            f.write(b"".join(self.digests))
+
+        self.generator = Generator(5, 5, digest=hashlib.sha1, foreground=["#000000", "#ff0000"])
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+
+        shutil.rmtree(self.directory)
+
+    def test_identicon_from_digest(self):
+        """
+        Tests if identicons created from binary digest are identical to ones
+        created from hex digest.
+        """
+
+        for digest in self.digests:
+            identicon = self.generator.identicon_from_digest(memoryview(digest))
+            hex_digest = binascii.hexlify(digest).decode("ascii")
+
+            self.assertEqual(identicon.key, self.generator.identicon(hex_digest).key)
+            self.assertEqual(identicon.render(50, 50), self.generator.generate(hex_digest, 50, 50))
+
+        self.assertRaises(ValueError, self.generator.identicon_from_digest, b"\x00" * 15)
+
+    def test_iterate(self):
+        """
+        Tests if all records are returned, as views of the mapped file.
+        """
+
+        with DigestFile(self.path, 20) as digest_file:
+            self.assertEqual(len(digest_file), 10)
+
+            records = [(index, bytes(record)) for index, record in digest_file]
+            self.assertEqual(records, list(enumerate(self.digests)))
+
+            for index, record in digest_file:
+                self.assertIsInstance(record, memoryview)
+                self.assertIs(record.obj, digest_file._mmap)
+                break
+            del record
+
+    def test_range(self):
+        """
+        Tests if records are read only from the requested byte range.
+        """
+
+        with DigestFile(self.path, 20, start=40, stop=100) as digest_file:
+            self.assertEqual(len(digest_file), 3)
+            self.assertEqual([(index, bytes(record)) for index, record in digest_file],
+                             [(2, self.digests[2]), (3, self.digests[3]), (4, self.digests[4])])
+
+    def test_invalid(self):
+        """
+        Tests if invalid record sizes and ranges are rejected.
+        """
+
+        self.assertRaises(ValueError, DigestFile, self.path, 8)
+        self.assertRaises(ValueError, DigestFile, self.path, 20, start=10)
+        self.assertRaises(ValueError, DigestFile, self.path, 20, stop=30)
+        self.assertRaises(ValueError, DigestFile, self.path, 20, stop=220)
+        self.assertRaises(ValueError, DigestFile, self.path, 20, start=60, stop=40)
+
+    def test_empty(self):
+        """
+        Tests reading of an empty file.
+        """
+
+        path = os.path.join(self.directory, "empty.bin")
+        open(path, "wb").close()
+
+        with DigestFile(path, 16) as digest_file:
+            self.assertEqual(len(digest_file), 0)
+            self.assertEqual(list(digest_file), [])
+
+    def test_close_with_views(self):
+        """
+        Tests if closing the reader while record views are still referenced
+        fails.
+        """
+
+        digest_file = DigestFile(self.path, 20)
+        records = [record for _, record in digest_file]
+
+        self.assertRaises(BufferError, digest_file.close)
+
+        del records
+        digest_file.close()
+
+    def test_shard_ranges(self):
+        """
+        Tests if shards are aligned to records and cover the whole file.
+        """
+
+        self.assertEqual(shard_ranges(self.path, 20, 3), [(0, 60), (60, 120), (120, 200)])
+        self.assertEqual(shard_ranges(self.path, 20, 1), [(0, 200)])
+        self.assertEqual(len([r for r in shard_ranges(self.path, 20, 20) if r[0] == r[1]]), 10)
+
+        records = []
+        for start, stop in shard_ranges(self.path, 20, 4):
+            with DigestFile(self.path, 20, start, stop) as digest_file:
+                records.extend(bytes(record) for _, record in digest_file)
+
+        self.assertEqual(records, self.digests)
+
+    def test_group_digests_by_key(self):
+        """
+        Tests if records are grouped by identicon key.
+        """
+
+        with DigestFile(self.path, 20) as digest_file:
+            groups = group_digests_by_key(self.generator, digest_file)
+
+        self.assertEqual(sorted(index for group in groups.values() for index in group), list(range(10)))
+
+        for key, group in groups.items():
+            for index in group:
+                self.assertEqual(self.generator.identicon(self.inputs[index]).key, key)
+
+    def test_render_unique_digests(self):
+        """
+        Tests if records get rendered and mapped by record index.
+        """
+
+        output_directory = os.path.join(self.directory, "output")
+
+        # Second run must update existing mappings, instead of duplicating
+        # them.
+        for i in range(2):
+            with DigestFile(self.path, 20, start=20) as digest_file:
+                with DirectorySink(output_directory, "png") as sink:
+                    statistics = render_unique_digests(self.generator, digest_file, sink, 50, 50)
+
+        self.assertEqual(statistics["inputs"], 9)
+        self.assertEqual(sorted(sink.mapping.keys()), sorted(str(index) for index in range(1, 10)))
+
+        with open(os.path.join(output_directory, "mapping.json")) as f:
+            self.assertEqual(f.read().count('"5"'), 1)
+
+        with open(os.path.join(output_directory, sink.mapping["5"]), "rb") as f:
+            self.assertEqual(f.read(), self.generator.generate(self.inputs[5], 50, 50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+# Standard library imports.
+import multiprocessing
+import pickle
+import struct
+import sys
+import time
+import unittest
+
+# Third-party Python library imports.
+import mock
+
+# Library imports.
+from pydenticon import Generator, clear_generators, get_generator
+from pydenticon.cache import RenderCache, SharedMemoryCache, shared_memory
+
+
+class RenderCacheTest(unittest.TestCase):
+    """
+    Implements tests for pydenticon.cache.RenderCache class.
+    """
+
+    def test_get_set(self):
+        """
+        Tests storing and looking-up of values.
+        """
+
+        cache = RenderCache()
+
+        self.assertEqual(cache.get("key"), None)
+
+        cache.set("key", b"value")
+
+        self.assertEqual(cache.get("key"), b"value")
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+
+        self.assertEqual(cache.get("key"), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction(self):
+        """
+        Tests if least recently used entries get evicted first.
+        """
+
+        cache = RenderCache(max_entries=2)
+
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.get("key1")
+        cache.set("key3", "value3")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("key1"), "value1")
+        self.assertEqual(cache.get("key2"), None)
+        self.assertEqual(cache.get("key3"), "value3")
+
+    @mock.patch.object(Generator, '_generate_image')
+    def test_generator_cache(self, generate_image_mock):
+        """
+        Tests if generators sharing a cache render every identicon only once,
+        and if unencoded formats bypass the cache.
+        """
+
+        generate_image_mock.return_value = b"test"
+
+        cache = RenderCache()
+        generator1 = Generator(5, 5, cache=cache)
+        generator2 = Generator(5, 5, cache=cache)
+
+        for generator in [generator1, generator2, generator1]:
+            self.assertEqual(generator.generate("test", 200, 200), b"test")
+
+        self.assertEqual(generate_image_mock.call_count, 1)
+        self.assertEqual(len(cache), 1)
+
+        generator1.generate("test", 200, 200, output_format="image")
+        generator1.generate("test", 200, 200, output_format="raw")
+
+        self.assertEqual(generate_image_mock.call_count, 3)
+        self.assertEqual(len(cache), 1)
+
+    def test_generator_cache_compressed(self):
+        """
+        Tests if compressed variants get cached, and if generators with
+        different configuration do not share cache entries.
+        """
+
+        cache = RenderCache()
+        generator1 = Generator(5, 5, cache=cache)
+        generator2 = Generator(5, 5, foreground=["#ff0000"], cache=cache)
+
+        self.assertNotEqual(generator1.fingerprint, generator2.fingerprint)
+        self.assertEqual(generator1.fingerprint, Generator(5, 5, foreground=["black"]).fingerprint)
+        self.assertNotEqual(generator1.fingerprint, Generator(5, 5, integer_hash="splitmix64").fingerprint)
+
+        body1, _ = generator1.generate_compressed("test", 200, 200, accept_encoding="gzip")
+        body2, _ = generator2.generate_compressed("test", 200, 200, accept_encoding="gzip")
+
+        self.assertNotEqual(body1, body2)
+        # Both raw and compressed variants are cached, for both generators.
+        self.assertEqual(len(cache), 4)
+
+        with mock.patch("pydenticon._compress") as compress_mock:
+            body, encoding = Generator(5, 5, cache=cache).generate_compressed("test", 200, 200, accept_encoding="gzip")
+
+        self.assertEqual(compress_mock.call_count, 0)
+        self.assertEqual((body, encoding), (body1, "gzip"))
+
+    def test_registry(self):
+        """
+        Tests if cache is part of generator registry configuration.
+        """
+
+        clear_generators()
+
+        cache = RenderCache()
+
+        self.assertIs(get_generator(5, 5, cache=cache).cache, cache)
+        self.assertIsNot(get_generator(5, 5, cache=cache), get_generator(5, 5))
+
+        clear_generators()
+
+
+def _check_shared_cache(cache, key, expected, other_key, other_value):
+    """
+    Checks value in the cache, and stores another one, from a child process.
+    """
+
+    if cache.get(key) != expected:
+        sys.exit(1)
+
+    cache.set(other_key, other_value)
+
+
+def _fill_shared_cache(cache, key, value):
+    """
+    Stores value in the cache from a child process.
+    """
+
+    cache.set(key, value)
+
+
+@unittest.skipIf(shared_memory is None, "Shared memory is not supported")
+class SharedMemoryCacheTest(unittest.TestCase):
+    """
+    Implements tests for pydenticon.cache.SharedMemoryCache class.
+    """
+
+    def setUp(self):
+        """
+        Sets-up a small shared memory cache.
+        """
+
+        self.cache = SharedMemoryCache(slots=16, slot_size=256, window=4)
+
+    def tearDown(self):
+        """
+        Removes the shared memory block.
+        """
+
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_get_set(self):
+        """
+        Tests storing and looking-up of byte and string values.
+        """
+
+        self.assertEqual(self.cache.get(("key", 1)), None)
+
+        self.cache.set(("key", 1), b"value")
+        self.cache.set(("key", 2), u"value")
+
+        self.assertEqual(self.cache.get(("key", 1)), b"value")
+        self.assertEqual(self.cache.get(("key", 2)), u"value")
+        self.assertIsInstance(self.cache.get(("key", 2)), str)
+        self.assertEqual(len(self.cache), 2)
+
+        self.cache.set(("key", 1), b"other value")
+
+        self.assertEqual(self.cache.get(("key", 1)), b"other value")
+        self.assertEqual(len(self.cache), 2)
+
+        self.cache.clear()
+
+        self.assertEqual(self.cache.get(("key", 1)), None)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_eviction(self):
+        """
+        Tests if cache stays bounded, and if most recent values are kept.
+        """
+
+        for i in range(100):
+            self.cache.set(("key", i), b"value%d" % i)
+
+        self.assertLessEqual(len(self.cache), 16)
+        self.assertEqual(self.cache.get(("key", 99)), b"value99")
+
+    def test_oversized(self):
+        """
+        Tests if values that do not fit into a slot are not cached.
+        """
+
+        self.cache.set("key", b"x" * 256)
+
+        self.assertEqual(self.cache.get("key"), None)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_write_in_progress(self):
+        """
+        Tests if slots that are being written to are treated as misses.
+        """
+
+        self.cache.set("key", b"value")
+
+        for offset in self.cache._offsets(self.cache._hash("key")):
+            sequence = struct.unpack_from("<Q", self.cache._memory.buf, offset)[0]
+
+            if sequence:
+                struct.pack_into("<Q", self.cache._memory.buf, offset, sequence + 1)
+                self.assertEqual(self.cache.get("key"), None)
+
+                struct.pack_into("<Q", self.cache._memory.buf, offset, sequence + 2)
+                self.assertEqual(self.cache.get("key"), b"value")
+
+    def test_lock_timeout(self):
+        """
+        Tests if writes are skipped instead of blocking when the lock is held
+        (for example by a killed process).
+        """
+
+        self.cache.set("key", b"value")
+
+        self.cache.lock.acquire()
+        try:
+            start = time.time()
+            self.cache.set("other key", b"other value")
+
+            self.assertLess(time.time() - start, 5)
+            self.assertEqual(self.cache.clear(), False)
+        finally:
+            self.cache.lock.release()
+
+        self.assertEqual(self.cache.get("key"), b"value")
+        self.assertEqual(self.cache.get("other key"), None)
+        self.assertEqual(self.cache.clear(), True)
+
+    def test_attach(self):
+        """
+        Tests if cache passed to a spawned process stays usable (and present)
+        after the process exits, and if unrelated processes cannot attach to
+        it.
+        """
+
+        context = multiprocessing.get_context("spawn")
+        cache = SharedMemoryCache(slots=16, slot_size=256, lock=context.Lock())
+
+        try:
+            cache.set("key", b"value")
+
+            process = context.Process(target=_check_shared_cache,
+                                      args=(cache, "key", b"value", "other key", u"other value"))
+            process.start()
+            process.join()
+
+            self.assertEqual(process.exitcode, 0)
+            self.assertEqual(cache.get("other key"), u"other value")
+
+            # Memory block must still exist.
+            memory = shared_memory.SharedMemory(name=cache.name)
+            memory.close()
+
+            # Lock can be shared only through inheritance.
+            self.assertRaises(RuntimeError, pickle.dumps, cache)
+        finally:
+            cache.close()
+            cache.unlink()
+
+    def test_multiple_processes(self):
+        """
+        Tests if values stored by a forked process are visible to its parent.
+        """
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("Fork is not supported")
+
+        process = multiprocessing.get_context("fork").Process(target=_fill_shared_cache,
+                                                              args=(self.cache, "key", b"value"))
+        process.start()
+        process.join()
+
+        self.assertEqual(self.cache.get("key"), b"value")
+
+    def test_generator_cache(self):
+        """
+        Tests if shared memory cache can be used by generators.
+        """
+
+        generator = Generator(5, 5, cache=self.cache)
+
+        ascii = generator.generate("test", 10, 10, output_format="ascii")
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(Generator(5, 5, cache=self.cache).identicon("test").render(10, 10, output_format="ascii"), ascii)
+
+
+if __name__ == '__main__':
+    unittest.main()
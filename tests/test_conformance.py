@@ -0,0 +1,77 @@
+# Standard library imports.
+import unittest
+
+# Library imports.
+from pydenticon import Generator
+from tests import conformance
+
+
+class ConformanceTest(unittest.TestCase):
+    """
+    Runs all rendering paths through the conformance harness.
+    """
+
+    def test_golden_samples(self):
+        """
+        Tests if all engines reproduce the golden samples.
+        """
+
+        divergences = conformance.golden_divergences()
+
+        self.assertEqual([str(divergence) for divergence in divergences], [])
+
+    def test_engines(self):
+        """
+        Tests if all engines match the reference pipeline for random and
+        edge-case inputs.
+        """
+
+        divergences = conformance.run(conformance.generate_cases(0, 200))
+
+        self.assertEqual([str(divergence) for divergence in divergences], [])
+
+    def test_integer_hash(self):
+        """
+        Tests if vectorised integer hashing matches the pure Python one.
+        """
+
+        self.assertEqual(conformance.integer_divergences(0, 200), [])
+
+    def test_divergence_reported(self):
+        """
+        Tests if divergences are detected, and reported with minimal
+        reproducer.
+        """
+
+        def broken_engine(case):
+            # Ignores inversion of colours.
+            return conformance.decode(case.generator().generate(case.data, case.width, case.height, padding=case.padding))
+
+        def broken_matrix_engine(case):
+            # Drops the last row.
+            matrix = conformance.reference_matrix(case)
+            return matrix[:-1] + [[False] * case.columns]
+
+        cases = [conformance.Case(5, 5, ["#000000", "#ff0000"], "#ffffff", "some test data", 100, 100, (3, 3, 3, 3), False),
+                 conformance.Case(5, 5, ["#000000", "#ff0000"], "#ffffff", "some test data", 100, 100, (3, 3, 3, 3), True)]
+
+        divergences = conformance.run(cases, image_engines={"broken": broken_engine},
+                                      matrix_engines={"broken": broken_matrix_engine})
+
+        self.assertEqual(len(divergences), 2)
+
+        self.assertEqual(divergences[0].engine, "broken")
+        self.assertEqual(divergences[0].case.inverted, True)
+        self.assertEqual(divergences[0].case.padding, (0, 0, 0, 0))
+        self.assertEqual(divergences[0].case.foreground, ["#000000"])
+        self.assertEqual((divergences[0].case.width, divergences[0].case.height), (5, 5))
+
+        # Reproducer should be valid code.
+        eval(divergences[0].case.reproducer(), {"Generator": Generator})
+
+        self.assertEqual(divergences[1].engine, "matrix/broken")
+        self.assertIn("reproducer: Generator(5, 5", str(divergences[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
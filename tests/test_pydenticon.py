@@ -1,5 +1,9 @@
 # Standard library imports.
+import base64
+import gzip
 import hashlib
+import threading
+import tracemalloc
 import unittest
 from io import BytesIO
 
@@ -8,8 +12,16 @@ import mock
 import PIL
 import PIL.ImageChops
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # Library imports.
-from pydenticon import Generator
+import pydenticon
+from pydenticon import (CanvasPool, Generator, Identicon, brotli, clear_generators, get_generator, select_encoding,
+                        splitmix64_digest, warm_generators)
+from pydenticon.cache import RenderCache
 
 
 class GeneratorTest(unittest.TestCase):
@@ -95,6 +107,27 @@ class GeneratorTest(unittest.TestCase):
 
         self.assertEqual(matrix, expected_matrix)
 
+    def test_generate_matrix_layouts(self):
+        """
+        Verifies that the matrix generated using pre-calculated cell layout is
+        identical to the one obtained by checking the digest bits one by one.
+        """
+
+        for rows, columns in [(5, 5), (4, 4), (3, 6), (7, 4), (10, 10)]:
+            generator = Generator(rows, columns)
+
+            for data in ["test1", "test2", "test3", "some test data"]:
+                hash_bytes = generator._data_to_digest_byte_list(data)
+
+                # Build the expected matrix bit by bit.
+                expected_matrix = [[False] * columns for _ in range(rows)]
+                for cell in range(rows * (columns // 2 + columns % 2)):
+                    if generator._get_bit(cell, hash_bytes[1:]):
+                        expected_matrix[cell % rows][cell // columns] = True
+                        expected_matrix[cell % rows][columns - cell // columns - 1] = True
+
+                self.assertEqual(generator._generate_matrix(hash_bytes), expected_matrix)
+
     def test_data_to_digest_byte_list_raw(self):
         """
         Test if correct digest byte list is returned for raw (non-hex-digest)
@@ -254,6 +287,411 @@ class GeneratorTest(unittest.TestCase):
         raw_image = generator.generate(data, 200, 200, output_format="ascii")
         self.assertIsInstance(raw_image, str)
 
+    def test_generate_format_unencoded(self):
+        """
+        Tests if identicons are returned without encoding when unencoded
+        output formats are requested.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        # Set-up some test data.
+        data = "some test data"
+
+        # Use the PNG output as reference.
+        raw_image = generator.generate(data, 200, 200, padding=(10, 10, 10, 10), output_format="png")
+        reference = PIL.Image.open(BytesIO(raw_image))
+
+        # Verify that Pillow image is returned when requested.
+        image = generator.generate(data, 200, 200, padding=(10, 10, 10, 10), output_format="image")
+        self.assertIsInstance(image, PIL.Image.Image)
+        self.assertEqual(image.mode, "RGBA")
+        self.assertEqual(image.size, (220, 220))
+        self.assertEqual(PIL.ImageChops.difference(image, reference).getextrema(), ((0, 0), (0, 0), (0, 0), (0, 0)))
+
+        # Verify that raw pixel buffer is returned when requested.
+        mode, size, pixels = generator.generate(data, 200, 200, padding=(10, 10, 10, 10), output_format="raw")
+        self.assertEqual(mode, "RGBA")
+        self.assertEqual(size, (220, 220))
+        self.assertEqual(pixels, reference.tobytes())
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_generate_format_numpy(self):
+        """
+        Tests if identicons are returned as NumPy array when requested.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        # Set-up some test data.
+        data = "some test data"
+
+        raw_image = generator.generate(data, 200, 100, output_format="png")
+        reference = PIL.Image.open(BytesIO(raw_image))
+
+        array = generator.generate(data, 200, 100, output_format="numpy")
+        self.assertEqual(array.shape, (100, 200, 4))
+        self.assertEqual(array.tobytes(), reference.tobytes())
+
+    @mock.patch("pydenticon.numpy", None)
+    def test_generate_format_numpy_missing(self):
+        """
+        Tests if an exception is raised in case NumPy output is requested
+        without NumPy being installed.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        self.assertRaises(ValueError, generator.generate, "some test data", 200, 200, output_format="numpy")
+
+    def test_generate_svg(self):
+        """
+        Tests the generated identicon in SVG format.
+        """
+
+        # Set-up parameters that will be used for generating the image.
+        matrix = [
+            [0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 1, 0, 1, 0],
+            ]
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        svg = generator._generate_svg(matrix, 50, 50, (1, 2, 3, 4), "rgba(255,0,0,128)", "#00ff00")
+
+        # Verify that background has foreground blocks cut out of it, and that
+        # foreground blocks are drawn with transparency.
+        expected_blocks = "M23 1h10v10h-10zM13 41h10v10h-10zM33 41h10v10h-10z"
+        expected_result = ('<svg xmlns="http://www.w3.org/2000/svg" width="57" height="53" shape-rendering="crispEdges">'
+                           '<path fill-rule="evenodd" fill="#00ff00" d="M0 0h57v53h-57z' + expected_blocks + '"/>'
+                           '<path fill="#ff0000" fill-opacity="0.5020" d="' + expected_blocks + '"/></svg>')
+        self.assertEqual(svg, expected_result)
+
+        # Verify that no foreground path is produced without any blocks.
+        svg = generator._generate_svg([[0] * 5] * 5, 50, 50, (0, 0, 0, 0), "#ff0000", "#00ff00")
+        self.assertNotIn("#ff0000", svg)
+
+    def test_generate_format_svg(self):
+        """
+        Tests if identicons are generated in SVG format when requested.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5, foreground=["#ff0000"], background="#00ff00")
+
+        svg = generator.generate("some test data", 200, 200, output_format="svg")
+        self.assertTrue(svg.startswith("<svg "))
+        self.assertIn('fill="#00ff00"', svg)
+        self.assertIn('fill="#ff0000"', svg)
+
+        # Colours are parsed only once, when generator is initialised.
+        with mock.patch("PIL.ImageColor.getrgb") as getrgb_mock:
+            self.assertEqual(generator.generate("some test data", 200, 200, output_format="svg", inverted=True),
+                             svg.replace("#00ff00", "#tmp").replace("#ff0000", "#00ff00").replace("#tmp", "#ff0000"))
+
+        self.assertEqual(getrgb_mock.call_count, 0)
+
+    def test_generate_format_data_uri(self):
+        """
+        Tests if identicons are generated as data URIs when requested.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        # Set-up some test data.
+        data = "some test data"
+
+        for output_format, prefix in [("png", "data:image/png;base64,"),
+                                      ("jpeg", "data:image/jpeg;base64,"),
+                                      ("svg", "data:image/svg+xml;base64,"),
+                                      ("ascii", "data:text/plain;base64,")]:
+            data_uri = generator.generate(data, 200, 200, output_format="data-uri:" + output_format, inverted=True)
+            raw = generator.generate(data, 200, 200, output_format=output_format, inverted=True)
+
+            self.assertTrue(data_uri.startswith(prefix))
+            if not isinstance(raw, bytes):
+                raw = raw.encode("utf-8")
+            self.assertEqual(base64.b64decode(data_uri[len(prefix):]), raw)
+
+        self.assertRaises(ValueError, generator.generate, data, 200, 200, output_format="data-uri:raw")
+
+    def test_embed(self):
+        """
+        Tests generation of data URIs for a batch of inputs.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        inputs = ["test1", "test2", "test1"]
+
+        data_uris = generator.embed(inputs, 200, 200, padding=(10, 10, 10, 10))
+        self.assertEqual(data_uris, [generator.generate(data, 200, 200, padding=(10, 10, 10, 10), output_format="data-uri:png")
+                                     for data in inputs])
+
+        data_uris = generator.embed(inputs, 200, 200, image_format="svg", inverted=True)
+        self.assertEqual(data_uris, [generator.generate(data, 200, 200, output_format="data-uri:svg", inverted=True)
+                                     for data in inputs])
+
+        tags = generator.embed(inputs, 200, 200, padding=(10, 10, 5, 5), image_format="svg", html=True)
+        self.assertEqual(tags[0], '<img src="%s" width="210" height="220" alt="">' %
+                         generator.generate("test1", 200, 200, padding=(10, 10, 5, 5), output_format="data-uri:svg"))
+
+    def test_embed_smallest(self):
+        """
+        Tests if the smaller of SVG and PNG data URIs is picked.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        for data in ["test1", "test2"]:
+            for width in [10, 2000]:
+                candidates = [generator.generate(data, width, width, output_format="data-uri:png"),
+                              generator.generate(data, width, width, output_format="data-uri:svg")]
+
+                self.assertEqual(generator.embed([data], width, width, image_format="smallest"), [min(candidates, key=len)])
+
+    @mock.patch.object(Generator, '_generate_image')
+    def test_embed_reuse(self, generate_image_mock):
+        """
+        Tests if identical identicons are encoded only once per batch.
+        """
+
+        generate_image_mock.return_value = b"test"
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        generator.embed(["test1", "test2", "test1", "test2", "test1"], 200, 200)
+
+        self.assertEqual(generate_image_mock.call_count, 2)
+
+    def test_select_encoding(self):
+        """
+        Tests selection of content encoding based on Accept-Encoding header.
+        """
+
+        self.assertEqual(select_encoding(None), None)
+        self.assertEqual(select_encoding(""), None)
+        self.assertEqual(select_encoding("identity"), None)
+        self.assertEqual(select_encoding("gzip"), "gzip")
+        self.assertEqual(select_encoding("GZIP, deflate"), "gzip")
+        self.assertEqual(select_encoding("gzip;q=0"), None)
+        self.assertEqual(select_encoding("*"), "br" if brotli is not None else "gzip")
+        self.assertEqual(select_encoding("br;q=1.0, gzip;q=0.5"), "br" if brotli is not None else "gzip")
+        self.assertEqual(select_encoding("br;q=0.5, gzip;q=1.0"), "gzip")
+
+    def test_generate_compressed(self):
+        """
+        Tests if compressed identicons decompress to regular ones.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        for output_format in ["svg", "ascii"]:
+            expected = generator.generate("test", 200, 200, output_format=output_format).encode("utf-8")
+
+            body, encoding = generator.generate_compressed("test", 200, 200, output_format=output_format,
+                                                           accept_encoding="gzip")
+            self.assertEqual(encoding, "gzip")
+            self.assertEqual(gzip.decompress(body), expected)
+
+            body, encoding = generator.generate_compressed("test", 200, 200, output_format=output_format)
+            self.assertEqual(encoding, None)
+            self.assertEqual(body, expected)
+
+        if brotli is not None:
+            body, encoding = generator.generate_compressed("test", 200, 200, accept_encoding="br")
+            self.assertEqual(encoding, "br")
+            self.assertEqual(brotli.decompress(body), generator.generate("test", 200, 200, output_format="svg").encode("utf-8"))
+
+    def test_generate_compressed_binary(self):
+        """
+        Tests if binary formats are not compressed, and if unencoded formats
+        are rejected.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        body, encoding = generator.generate_compressed("test", 200, 200, output_format="png", accept_encoding="gzip")
+
+        self.assertEqual(encoding, None)
+        self.assertEqual(body, generator.generate("test", 200, 200, output_format="png"))
+
+        self.assertRaises(ValueError, generator.generate_compressed, "test", 200, 200, output_format="raw")
+
+    def test_generate_compressed_reuse(self):
+        """
+        Tests if every identicon variant gets compressed only once, even
+        without generator cache, and if uncompressed variants are not stored
+        twice.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        with mock.patch("pydenticon._compress", wraps=pydenticon._compress) as compress_mock:
+            for i in range(3):
+                generator.generate_compressed("test", 200, 200, accept_encoding="gzip")
+
+        self.assertEqual(compress_mock.call_count, 1)
+        self.assertEqual(len(generator._compressed_cache), 1)
+
+        generator.generate_compressed("test", 200, 200)
+        self.assertEqual(len(generator._compressed_cache), 1)
+
+        cache = RenderCache()
+        generator = Generator(5, 5, cache=cache)
+        generator.generate_compressed("test", 200, 200)
+
+        self.assertEqual(len(cache), 1)
+
+    def test_integer_compatibility(self):
+        """
+        Tests if integers are hashed through their string representation by
+        default.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        for value in [0, 42, -7, 2 ** 70]:
+            self.assertEqual(generator.generate(value, 200, 200), generator.generate(str(value), 200, 200))
+
+        if numpy is not None:
+            self.assertEqual(generator.identicon(numpy.int64(42)).key, generator.identicon("42").key)
+
+        # Booleans are not treated as integers.
+        self.assertRaises(TypeError, generator.generate, True, 200, 200)
+
+    def test_integer_hash(self):
+        """
+        Tests hashing of integers using opt-in integer hash.
+        """
+
+        generator = Generator(5, 5, integer_hash="splitmix64")
+
+        self.assertEqual(generator._data_to_digest_byte_list(0), list(bytearray(splitmix64_digest(0))))
+        self.assertEqual(generator._data_to_digest_byte_list(-1), generator._data_to_digest_byte_list(2 ** 64 - 1))
+        self.assertNotEqual(generator.identicon(42).key, Generator(5, 5).identicon(42).key)
+
+        # String data is not affected.
+        self.assertEqual(generator.generate("42", 200, 200), Generator(5, 5).generate("42", 200, 200))
+
+        self.assertRaises(ValueError, generator.generate, 2 ** 64, 200, 200)
+        self.assertRaises(ValueError, generator.generate, -2 ** 63 - 1, 200, 200)
+
+    def test_integer_hash_custom(self):
+        """
+        Tests hashing of integers using custom integer hash.
+        """
+
+        def integer_hash(value):
+            return value.to_bytes(16, "big")
+
+        generator = Generator(5, 5, integer_hash=integer_hash)
+
+        self.assertEqual(generator._data_to_digest_byte_list(258), [0] * 14 + [1, 2])
+
+        generator = Generator(5, 5, integer_hash=lambda value: b"short")
+        self.assertRaises(ValueError, generator.generate, 42, 200, 200)
+
+        self.assertRaises(ValueError, Generator, 5, 5, integer_hash="invalid")
+
+    def test_identicons_from_integers(self):
+        """
+        Tests if identicons for a batch of integers match the ones created one
+        by one.
+        """
+
+        values = [0, 1, -1, 42, 2 ** 63, 2 ** 64 - 1]
+
+        for integer_hash in [None, "splitmix64"]:
+            generator = Generator(5, 5, integer_hash=integer_hash)
+
+            batches = [values]
+            if numpy is not None:
+                batches.append(numpy.array(values[:4], dtype=numpy.int64))
+
+            for batch in batches:
+                identicons = generator.identicons_from_integers(batch)
+
+                self.assertEqual([identicon.key for identicon in identicons],
+                                 [generator.identicon(int(value)).key for value in batch])
+                self.assertEqual([identicon.data for identicon in identicons], list(batch))
+
+            # Iterators are consumed only once.
+            identicons = generator.identicons_from_integers(iter(values))
+            self.assertEqual([identicon.data for identicon in identicons], values)
+
+            for invalid in [["12"], [1.5], [True], [1, None]]:
+                self.assertRaises(ValueError, generator.identicons_from_integers, invalid)
+
+            if numpy is not None:
+                self.assertRaises(ValueError, generator.identicons_from_integers, numpy.array([1.5]))
+
+    def test_stream(self):
+        """
+        Tests if streamed identicons match the generated ones.
+        """
+
+        # Set-up a generator.
+        generator = Generator(5, 5, foreground=["#ff0000", "rgba(0,0,255,128)"], background="rgba(224,224,224,64)")
+
+        for data in ["test1", "test2", "test3"]:
+            for width, height, padding in [(200, 200, (0, 0, 0, 0)), (203, 97, (20, 5, 3, 11)), (5, 5, (1, 1, 1, 1))]:
+                for inverted in [False, True]:
+                    stream = BytesIO()
+                    generator.stream(data, stream, width, height, padding=padding, inverted=inverted)
+
+                    expected = PIL.Image.open(BytesIO(generator.generate(data, width, height, padding=padding,
+                                                                         inverted=inverted)))
+                    actual = PIL.Image.open(BytesIO(stream.getvalue()))
+
+                    self.assertEqual(actual.mode, "RGBA")
+                    self.assertEqual(actual.size, expected.size)
+                    self.assertEqual(actual.tobytes(), expected.tobytes())
+
+        self.assertRaises(ValueError, generator.stream, "test", BytesIO(), 0, 0)
+
+    def test_stream_memory(self):
+        """
+        Tests if peak memory usage of streaming does not depend on image
+        height.
+        """
+
+        class Sink(object):
+            def write(self, data):
+                pass
+
+        # Set-up a generator.
+        generator = Generator(5, 5)
+
+        peaks = []
+
+        for height in [500, 4000]:
+            tracemalloc.start()
+            try:
+                generator.stream("test", Sink(), 2000, height, padding=(20, 20, 20, 20))
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+
+        # Full RGBA canvas for the larger image would take 32MB.
+        self.assertLess(peaks[1], 2 * peaks[0])
+        self.assertLess(peaks[1], 2000 * 4000 * 4 // 16)
+
     def test_generate_format_invalid(self):
         """
         Tests if an exception is raised in case an unsupported format is
@@ -407,5 +845,347 @@ class GeneratorTest(unittest.TestCase):
         self.assertEqual(diff2.getextrema(), expected_extrema)
         self.assertEqual(diff3.getextrema(), expected_extrema)
 
+
+class CanvasPoolTest(unittest.TestCase):
+    """
+    Implements tests for pydenticon.CanvasPool class.
+    """
+
+    def test_checkout(self):
+        """
+        Tests if canvases are reused, and reset to background colour.
+        """
+
+        pool = CanvasPool()
+
+        canvas = pool.checkout((10, 20), "RGBA", "#ff0000")
+        self.assertEqual(canvas.size, (10, 20))
+        self.assertEqual(canvas.mode, "RGBA")
+        self.assertEqual(canvas.getextrema(), ((255, 255), (0, 0), (0, 0), (255, 255)))
+
+        canvas.paste("#00ff00", (0, 0, 5, 5))
+
+        self.assertIs(pool.checkout((10, 20), "RGBA", "#ff0000"), canvas)
+        self.assertEqual(canvas.getextrema(), ((255, 255), (0, 0), (0, 0), (255, 255)))
+
+        self.assertIsNot(pool.checkout((10, 20), "RGB", "#ff0000"), canvas)
+        self.assertIsNot(pool.checkout((10, 20), "RGBA", "#0000ff"), canvas)
+        self.assertIsNot(pool.checkout((20, 10), "RGBA", "#ff0000"), canvas)
+
+    def test_checkout_limit(self):
+        """
+        Tests if least recently used canvases are dropped from the pool.
+        """
+
+        pool = CanvasPool(max_canvases=2)
+
+        first = pool.checkout((10, 10), "RGBA", "#ffffff")
+        second = pool.checkout((20, 20), "RGBA", "#ffffff")
+        self.assertIs(pool.checkout((10, 10), "RGBA", "#ffffff"), first)
+
+        pool.checkout((30, 30), "RGBA", "#ffffff")
+
+        self.assertIs(pool.checkout((10, 10), "RGBA", "#ffffff"), first)
+        self.assertIsNot(pool.checkout((20, 20), "RGBA", "#ffffff"), second)
+
+    def test_checkout_threads(self):
+        """
+        Tests if every thread gets its own canvases.
+        """
+
+        pool = CanvasPool()
+        canvases = []
+
+        def worker():
+            canvases.append(pool.checkout((10, 10), "RGBA", "#ffffff"))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(pool.checkout((10, 10), "RGBA", "#ffffff"), canvases[0])
+
+    def test_generate(self):
+        """
+        Tests if identicons generated using pooled canvases are identical to
+        ones generated without pooling.
+        """
+
+        foreground = ["rgb(45,79,255)", "rgba(254,180,44,128)", "rgb(226,121,234)"]
+        background = "rgba(224,224,224,100)"
+
+        generator = Generator(5, 5, foreground=foreground, background=background)
+        pooled_generator = Generator(5, 5, foreground=foreground, background=background, canvas_pool=CanvasPool())
+
+        for data in ["test1", "test2", "test3", "test1"]:
+            for output_format in ["png", "jpeg", "gif", "raw"]:
+                self.assertEqual(pooled_generator.generate(data, 200, 200, padding=(20, 10, 5, 0), output_format=output_format),
+                                 generator.generate(data, 200, 200, padding=(20, 10, 5, 0), output_format=output_format))
+
+    def test_generate_results_independent(self):
+        """
+        Tests if results are not affected by later reuse of pooled canvases.
+        """
+
+        generator = Generator(5, 5, canvas_pool=CanvasPool())
+
+        image = generator.generate("test1", 100, 100, output_format="image")
+        raw_image = generator.generate("test1", 100, 100, output_format="raw")
+        png_image = generator.generate("test1", 100, 100, output_format="png")
+
+        generator.generate("test2", 100, 100, output_format="png")
+
+        self.assertEqual(image.tobytes(), raw_image[2])
+        self.assertEqual(PIL.Image.open(BytesIO(png_image)).tobytes(), raw_image[2])
+
+
+class GeneratorRegistryTest(unittest.TestCase):
+    """
+    Implements tests for registry of shared generators.
+    """
+
+    def setUp(self):
+        """
+        Starts every test with an empty registry.
+        """
+
+        clear_generators()
+
+    def tearDown(self):
+        """
+        Cleans-up the registry after every test.
+        """
+
+        clear_generators()
+
+    def test_get_generator(self):
+        """
+        Tests if generators are created with passed configuration, and shared
+        between identical configurations.
+        """
+
+        generator = get_generator(5, 5, digest=hashlib.sha1, foreground=["#111111", "#222222"], background="#aabbcc")
+
+        self.assertEqual(generator.rows, 5)
+        self.assertEqual(generator.columns, 5)
+        self.assertEqual(generator.digest, hashlib.sha1)
+        self.assertEqual(generator.foreground, ["#111111", "#222222"])
+        self.assertEqual(generator.background, "#aabbcc")
+
+        self.assertIs(get_generator(5, 5, digest=hashlib.sha1, foreground=("#111111", "#222222"), background="#aabbcc"), generator)
+
+    def test_get_generator_normalised(self):
+        """
+        Tests if configurations that differ only in colour notation share the
+        generator, while different configurations do not.
+        """
+
+        generator = get_generator(5, 5, foreground=["#000000"], background="#ffffff")
+
+        self.assertIs(get_generator(5, 5, foreground=["black"], background="#fff"), generator)
+        self.assertIs(get_generator(5, 5), generator)
+
+        self.assertIsNot(get_generator(5, 5, foreground=["#000001"]), generator)
+        self.assertIsNot(get_generator(5, 6), generator)
+        self.assertIsNot(get_generator(5, 5, digest=hashlib.sha1), generator)
+
+    def test_get_generator_copies_foreground(self):
+        """
+        Tests if shared generators are not affected by caller modifying the
+        list of foreground colours.
+        """
+
+        foreground = ["#000000", "#ffffff"]
+        generator = get_generator(5, 5, foreground=foreground)
+
+        foreground.append("#aaaaaa")
+
+        self.assertEqual(generator.foreground, ["#000000", "#ffffff"])
+
+    def test_get_generator_threads(self):
+        """
+        Tests if concurrent requests for the same configuration end-up with the
+        same generator.
+        """
+
+        results = []
+
+        def worker():
+            results.append(get_generator(6, 6, foreground=["#123456"]))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        for generator in results:
+            self.assertIs(generator, results[0])
+
+    def test_warm_generators(self):
+        """
+        Tests if generators get created in advance.
+        """
+
+        generators = warm_generators([{"rows": 5, "columns": 5},
+                                      {"rows": 8, "columns": 8, "foreground": ["#ff0000"]}])
+
+        self.assertEqual(len(generators), 2)
+        self.assertIs(get_generator(5, 5), generators[0])
+        self.assertIs(get_generator(8, 8, foreground=["#ff0000"]), generators[1])
+
+    def test_clear_generators(self):
+        """
+        Tests if registry gets cleared.
+        """
+
+        generator = get_generator(5, 5)
+
+        clear_generators()
+
+        self.assertIsNot(get_generator(5, 5), generator)
+
+
+class IdenticonTest(unittest.TestCase):
+    """
+    Implements tests for pydenticon.Identicon class.
+    """
+
+    def test_identicon(self):
+        """
+        Tests if generator produces identicon objects bound to it.
+        """
+
+        generator = Generator(5, 5)
+
+        identicon = generator.identicon("some test data")
+
+        self.assertIsInstance(identicon, Identicon)
+        self.assertIs(identicon.generator, generator)
+        self.assertEqual(identicon.data, "some test data")
+
+    def test_lazy_evaluation(self):
+        """
+        Tests if intermediate results are calculated only once, and only when
+        accessed.
+        """
+
+        generator = Generator(5, 5)
+
+        with mock.patch.object(generator, "_data_to_digest_byte_list", wraps=generator._data_to_digest_byte_list) as digest_mock, \
+                mock.patch.object(generator, "_generate_matrix", wraps=generator._generate_matrix) as matrix_mock:
+            identicon = generator.identicon("some test data")
+
+            self.assertEqual(digest_mock.call_count, 0)
+            self.assertEqual(matrix_mock.call_count, 0)
+
+            identicon.foreground_index
+            identicon.foreground
+            self.assertEqual(digest_mock.call_count, 1)
+            self.assertEqual(matrix_mock.call_count, 0)
+
+            identicon.matrix
+            identicon.key
+            identicon.render(200, 200, output_format="ascii")
+            self.assertEqual(digest_mock.call_count, 1)
+            self.assertEqual(matrix_mock.call_count, 1)
+
+    def test_properties(self):
+        """
+        Tests if identicon properties match what the generator uses.
+        """
+
+        foreground = ["#000000", "#111111", "#222222", "#333333", "#444444", "#555555"]
+        generator = Generator(5, 5, foreground=foreground)
+
+        # The first byte of hex digest should be 121 for this data, which should
+        # result in foreground colour of index '1'.
+        identicon = generator.identicon("some test data")
+
+        self.assertEqual(identicon.digest_byte_list, generator._data_to_digest_byte_list("some test data"))
+        self.assertEqual(identicon.matrix, generator._generate_matrix(identicon.digest_byte_list))
+        self.assertEqual(identicon.foreground_index, 1)
+        self.assertEqual(identicon.foreground, "#111111")
+
+    def test_key(self):
+        """
+        Tests if identicon key is derived from foreground colour index and
+        matrix.
+        """
+
+        generator = Generator(5, 5, foreground=["#000000", "#111111"])
+
+        identicon = generator.identicon("some test data")
+
+        # Set-up a simple matrix, with foreground colour index '1'.
+        identicon._digest_byte_list = [121]
+        identicon._matrix = [
+            [1, 0, 0, 0, 1],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            ]
+
+        self.assertEqual(identicon.key, "01" + "1100000")
+
+        # Different data producing identical identicons share the key.
+        identicon_copy = generator.identicon("other data")
+        identicon_copy._digest_byte_list = [123]
+        identicon_copy._matrix = identicon._matrix
+        self.assertEqual(identicon_copy.key, identicon.key)
+
+    def test_render(self):
+        """
+        Tests if rendered identicons are identical to ones produced by
+        generator.
+        """
+
+        generator = Generator(5, 5, foreground=["#000000", "#111111"])
+        identicon = generator.identicon("some test data")
+
+        self.assertEqual(identicon.render(200, 200, padding=(1, 2, 3, 4), inverted=True),
+                         generator.generate("some test data", 200, 200, padding=(1, 2, 3, 4), inverted=True))
+        self.assertEqual(identicon.render(200, 200, output_format="ascii"),
+                         generator.generate("some test data", 200, 200, output_format="ascii"))
+
+    @mock.patch.object(Generator, '_generate_image')
+    def test_render_memoized(self, generate_image_mock):
+        """
+        Tests if renders are memoized, except for mutable results.
+        """
+
+        generator = Generator(5, 5)
+        identicon = generator.identicon("some test data")
+
+        identicon.render(200, 200)
+        identicon.render(200, 200, padding=[0, 0, 0, 0])
+        self.assertEqual(generate_image_mock.call_count, 1)
+
+        identicon.render(100, 100)
+        self.assertEqual(generate_image_mock.call_count, 2)
+
+        identicon.render(100, 100, output_format="image")
+        identicon.render(100, 100, output_format="image")
+        self.assertEqual(generate_image_mock.call_count, 4)
+
+    def test_render_data_uri(self):
+        """
+        Tests if data URIs reuse memoized renders.
+        """
+
+        generator = Generator(5, 5)
+        identicon = generator.identicon("some test data")
+
+        raw_image = identicon.render(200, 200)
+
+        with mock.patch.object(Generator, '_generate_image') as generate_image_mock:
+            data_uri = identicon.render(200, 200, output_format="data-uri:png")
+
+        self.assertEqual(generate_image_mock.call_count, 0)
+        self.assertEqual(data_uri, "data:image/png;base64," + base64.b64encode(raw_image).decode("ascii"))
+
+
 if __name__ == '__main__':
     unittest.main()